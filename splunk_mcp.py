@@ -1,47 +1,79 @@
 # Import packages
-import json
+import atexit
+import functools
+import hashlib
 import logging
+import logging.handlers
 import os
+import queue
+import re
 import ssl
-import traceback
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Union
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, List, Any, Optional
+from urllib.parse import quote
 
-import splunklib.client
+import httpx
+import orjson
 from decouple import config
 from mcp.server.fastmcp import FastMCP
-from splunklib import results
 import sys
-import socket
 import asyncio
-from fastapi import FastAPI, APIRouter, Request
+from fastapi import FastAPI, Request
 from fastapi.openapi.docs import get_swagger_ui_html, get_redoc_html
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from mcp.server.sse import SseServerTransport
 from starlette.routing import Mount
-import uvicorn
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(os.path.join(os.path.dirname(__file__), "splunk_mcp.log"))
-    ]
-)
+
+if TYPE_CHECKING:
+    import splunklib.client
+
+# Configure logging; records are queued and written to the console and log
+# file by a background listener so logging never blocks the event loop
+_log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+_log_handlers = [
+    logging.StreamHandler(),
+    logging.FileHandler(os.path.join(os.path.dirname(__file__), "splunk_mcp.log"))
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# Leave the full formatting to the listener's handlers
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
 # Environment variables
 FASTMCP_PORT = int(os.environ.get("FASTMCP_PORT", "8000"))
 os.environ["FASTMCP_PORT"] = str(FASTMCP_PORT)
+DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the OpenAPI schema at startup and close the Splunk HTTP client on shutdown"""
+    await get_openapi_schema_bytes()
+    yield
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
 
 # Create FastAPI application with metadata
 app = FastAPI(
     title="Splunk MCP API",
     description="A FastMCP-based tool for interacting with Splunk Enterprise/Cloud through natural language",
     version="0.3.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+    # Serve the custom /openapi.json, /docs and /redoc routes defined below
+    # instead of FastAPI's built-in ones, which would otherwise take precedence
+    openapi_url=None,
 )
 
 # Initialize the MCP server
@@ -104,42 +136,121 @@ async def redoc_html():
         title=f"{mcp.name} - ReDoc"
     )
 
-@app.get("/openapi.json", include_in_schema=False)
-async def get_openapi_schema():
-    """Generate OpenAPI schema that documents MCP tools as operations"""
-    # Get the OpenAPI schema from MCP tools
-    tools = await list_tools()
+# Serialized OpenAPI schema and its ETag, built once at startup (or on first use)
+_OPENAPI_CACHE: Optional[bytes] = None
+_OPENAPI_ETAG: Optional[str] = None
+_OPENAPI_LOCK = asyncio.Lock()
+OPENAPI_CACHE_CONTROL = "public, max-age=60"
+
+async def get_openapi_schema_bytes() -> bytes:
+    """Return the serialized OpenAPI schema, building and caching it on first use"""
+    global _OPENAPI_CACHE, _OPENAPI_ETAG
+    if _OPENAPI_CACHE is None:
+        async with _OPENAPI_LOCK:
+            if _OPENAPI_CACHE is None:
+                openapi_schema = await build_openapi_schema()
+                body = orjson.dumps(openapi_schema)
+                _OPENAPI_ETAG = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+                _OPENAPI_CACHE = body
     
-    # Define the tool request/response schemas
-    tool_schemas = {
-        "ToolRequest": {
-            "type": "object",
-            "required": ["tool", "parameters"],
-            "properties": {
-                "tool": {
-                    "type": "string",
-                    "description": "The name of the tool to execute"
-                },
-                "parameters": {
+    return _OPENAPI_CACHE
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison (RFC 9110 section 13.1.2)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+@app.get("/openapi.json", include_in_schema=False)
+async def get_openapi_schema(request: Request):
+    """Serve the cached OpenAPI schema that documents MCP tools as operations"""
+    body = await get_openapi_schema_bytes()
+    headers = {"ETag": _OPENAPI_ETAG, "Cache-Control": OPENAPI_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), _OPENAPI_ETAG):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Static parts of the OpenAPI schema; only the tool-dependent parts are built per call
+_OPENAPI_TOOL_SCHEMAS = {
+    "ToolResponse": {
+        "type": "object",
+        "properties": {
+            "result": {
+                "type": "object",
+                "description": "The result of the tool execution"
+            },
+            "error": {
+                "type": "string",
+                "description": "Error message if the execution failed"
+            }
+        }
+    }
+}
+
+_OPENAPI_TOOL_RESPONSES = {
+    "200": {
+        "description": "Successful tool execution",
+        "content": {
+            "application/json": {
+                "schema": {"$ref": "#/components/schemas/ToolResponse"}
+            }
+        }
+    },
+    "400": {
+        "description": "Invalid parameters",
+        "content": {
+            "application/json": {
+                "schema": {
                     "type": "object",
-                    "description": "Parameters for the tool execution"
+                    "properties": {
+                        "error": {"type": "string"}
+                    }
                 }
             }
-        },
-        "ToolResponse": {
-            "type": "object",
-            "properties": {
-                "result": {
-                    "type": "object",
-                    "description": "The result of the tool execution"
-                },
-                "error": {
-                    "type": "string",
-                    "description": "Error message if the execution failed"
+        }
+    }
+}
+
+_OPENAPI_PATHS = {
+    "/sse": {
+        "get": {
+            "summary": "SSE Connection",
+            "description": "Establishes a Server-Sent Events connection for real-time communication",
+            "tags": ["MCP Core"],
+            "responses": {
+                "200": {
+                    "description": "SSE connection established"
+                }
+            }
+        }
+    },
+    "/messages": {
+        "get": {
+            "summary": "Messages Endpoint",
+            "description": "Endpoint for SSE message communication",
+            "tags": ["MCP Core"],
+            "responses": {
+                "200": {
+                    "description": "Message endpoint ready"
                 }
             }
         }
     }
+}
+
+_OPENAPI_TAGS = [
+    {"name": "MCP Core", "description": "Core MCP server endpoints"},
+    {"name": "MCP Tools", "description": "Available MCP tools and operations"}
+]
+
+async def build_openapi_schema() -> Dict[str, Any]:
+    """Generate OpenAPI schema that documents MCP tools as operations"""
+    # Get the OpenAPI schema from MCP tools
+    tools = await list_tools()
     
     # Convert MCP tools to OpenAPI operations
     tool_operations = {}
@@ -183,29 +294,7 @@ async def get_openapi_schema():
                     }
                 }
             },
-            "responses": {
-                "200": {
-                    "description": "Successful tool execution",
-                    "content": {
-                        "application/json": {
-                            "schema": {"$ref": "#/components/schemas/ToolResponse"}
-                        }
-                    }
-                },
-                "400": {
-                    "description": "Invalid parameters",
-                    "content": {
-                        "application/json": {
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "error": {"type": "string"}
-                                }
-                            }
-                        }
-                    }
-                }
-            }
+            "responses": _OPENAPI_TOOL_RESPONSES
         }
     
     # Build OpenAPI schema
@@ -216,60 +305,10 @@ async def get_openapi_schema():
             "description": "A FastMCP-based tool for interacting with Splunk Enterprise/Cloud through natural language",
             "version": VERSION
         },
-        "paths": {
-            "/sse": {
-                "get": {
-                    "summary": "SSE Connection",
-                    "description": "Establishes a Server-Sent Events connection for real-time communication",
-                    "tags": ["MCP Core"],
-                    "responses": {
-                        "200": {
-                            "description": "SSE connection established"
-                        }
-                    }
-                }
-            },
-            "/messages": {
-                "get": {
-                    "summary": "Messages Endpoint",
-                    "description": "Endpoint for SSE message communication",
-                    "tags": ["MCP Core"],
-                    "responses": {
-                        "200": {
-                            "description": "Message endpoint ready"
-                        }
-                    }
-                }
-            },
-            "/execute": {
-                "post": {
-                    "summary": "Execute MCP Tool",
-                    "description": "Execute any available MCP tool with the specified parameters",
-                    "tags": ["MCP Tools"],
-                    "requestBody": {
-                        "required": True,
-                        "content": {
-                            "application/json": {
-                                "schema": {"$ref": "#/components/schemas/ToolRequest"}
-                            }
-                        }
-                    },
-                    "responses": {
-                        "200": {
-                            "description": "Tool executed successfully",
-                            "content": {
-                                "application/json": {
-                                    "schema": {"$ref": "#/components/schemas/ToolResponse"}
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        },
+        "paths": _OPENAPI_PATHS,
         "components": {
             "schemas": {
-                **tool_schemas,
+                **_OPENAPI_TOOL_SCHEMAS,
                 **{f"{tool['name']}Parameters": {
                     "type": "object",
                     "properties": tool.get("parameters", {}).get("properties", {}),
@@ -277,65 +316,205 @@ async def get_openapi_schema():
                 } for tool in tools}
             }
         },
-        "tags": [
-            {"name": "MCP Core", "description": "Core MCP server endpoints"},
-            {"name": "MCP Tools", "description": "Available MCP tools and operations"}
-        ],
+        "tags": _OPENAPI_TAGS,
         "x-mcp-tools": tool_operations
     }
     
-    return JSONResponse(content=openapi_schema)
+    return openapi_schema
 
 # Global variables
 VERSION = "0.3.0"
 SPLUNK_HOST = os.environ.get("SPLUNK_HOST", "localhost")
 SPLUNK_PORT = int(os.environ.get("SPLUNK_PORT", "8089"))
 SPLUNK_SCHEME = os.environ.get("SPLUNK_SCHEME", "https")
+SPLUNK_USERNAME = os.environ.get("SPLUNK_USERNAME", "admin")
 SPLUNK_PASSWORD = os.environ.get("SPLUNK_PASSWORD", "admin")
 VERIFY_SSL = config("VERIFY_SSL", default="true", cast=bool)
 SPLUNK_TOKEN = os.environ.get("SPLUNK_TOKEN")  # New: support for token-based auth
+# Splunk treats count=0 as "all rows", which would defeat paging, so fetch at least one row per request
+SEARCH_RESULTS_BATCH_SIZE = max(1, int(os.environ.get("SPLUNK_RESULTS_BATCH_SIZE", "1000")))
+
+def _build_ssl_context() -> ssl.SSLContext:
+    """Build the SSL context shared by every connection to Splunk"""
+    context = ssl.create_default_context()
+    if not VERIFY_SSL:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+_SSL_CTX = _build_ssl_context()
 
-async def get_splunk_connection() -> splunklib.client.Service:
+def _build_connect_kwargs() -> Dict[str, Any]:
+    """Build the splunklib connect arguments from the Splunk settings"""
+    # splunklib only uses a supplied context when verify is True, otherwise it builds
+    # a new unverified context per request; VERIFY_SSL is applied by _SSL_CTX instead
+    kwargs = {
+        "host": SPLUNK_HOST,
+        "port": SPLUNK_PORT,
+        "scheme": SPLUNK_SCHEME,
+        "verify": True,
+        "context": _SSL_CTX,
+        "autologin": True,
+        "timeout": 30  # 30 second timeout
+    }
+    if SPLUNK_TOKEN:
+        kwargs["token"] = SPLUNK_TOKEN
+    else:
+        kwargs["username"] = SPLUNK_USERNAME
+        kwargs["password"] = SPLUNK_PASSWORD
+    return kwargs
+
+_CONNECT_KWARGS = _build_connect_kwargs()
+
+# Shared Splunk service, created on first use and reused by every tool call
+_SERVICE: Optional["splunklib.client.Service"] = None
+_SERVICE_LOCK = asyncio.Lock()
+
+async def get_splunk_connection() -> "splunklib.client.Service":
     """
     Get a connection to the Splunk service asynchronously.
     Supports both username/password and token-based authentication.
     If SPLUNK_TOKEN is set, it will be used for authentication and username/password will be ignored.
+    The service is created once and shared across tool calls. It is connected with
+    autologin enabled, so splunklib logs in again by itself when the session expires.
     Returns:
         splunklib.client.Service: Connected Splunk service
     """
+    global _SERVICE
+    if _SERVICE is not None:
+        return _SERVICE
+    
     def _connect():
         if SPLUNK_TOKEN:
-            logger.debug(f"🔌 Connecting to Splunk at {SPLUNK_SCHEME}://{SPLUNK_HOST}:{SPLUNK_PORT} using token authentication")
-            return splunklib.client.connect(
-                host=SPLUNK_HOST,
-                port=SPLUNK_PORT,
-                scheme=SPLUNK_SCHEME,
-                verify=VERIFY_SSL,
-                token=SPLUNK_TOKEN,
-                timeout=30  # 30 second timeout
-            )
+            logger.debug("🔌 Connecting to Splunk at %s://%s:%s using token authentication", SPLUNK_SCHEME, SPLUNK_HOST, SPLUNK_PORT)
         else:
-            username = os.environ.get("SPLUNK_USERNAME", "admin")
-            logger.debug(f"🔌 Connecting to Splunk at {SPLUNK_SCHEME}://{SPLUNK_HOST}:{SPLUNK_PORT} as {username}")
-            return splunklib.client.connect(
-                host=SPLUNK_HOST,
-                port=SPLUNK_PORT,
-                username=username,
-                password=SPLUNK_PASSWORD,
-                scheme=SPLUNK_SCHEME,
-                verify=VERIFY_SSL,
-                timeout=30  # 30 second timeout
-            )
+            logger.debug("🔌 Connecting to Splunk at %s://%s:%s as %s", SPLUNK_SCHEME, SPLUNK_HOST, SPLUNK_PORT, SPLUNK_USERNAME)
+        # splunklib is heavy to import, so load it on first connect only
+        import splunklib.client
+        return splunklib.client.connect(**_CONNECT_KWARGS)
     
-    try:
-        service = await asyncio.to_thread(_connect)
-        logger.debug(f"✅ Connected to Splunk successfully")
-        return service
-    except Exception as e:
-        logger.error(f"❌ Failed to connect to Splunk: {str(e)}")
-        raise
+    async with _SERVICE_LOCK:
+        # Another caller may have connected while we waited for the lock
+        if _SERVICE is not None:
+            return _SERVICE
+        
+        try:
+            _SERVICE = await asyncio.to_thread(_connect)
+            logger.debug("✅ Connected to Splunk successfully")
+            return _SERVICE
+        except Exception as e:
+            logger.error(f"❌ Failed to connect to Splunk: {str(e)}")
+            raise
+
+# Shared async HTTP client for Splunk REST endpoints that don't need splunklib
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+def get_splunk_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client for calling the Splunk REST API directly.
+    The client keeps connections to Splunk alive and pools them across tool calls.
+    If SPLUNK_TOKEN is set it is sent in the Authorization header, otherwise
+    the client uses HTTP basic auth with the configured username and password.
+    Returns:
+        httpx.AsyncClient: Client with its base URL set to the Splunk management port
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        headers = {}
+        auth = None
+        if SPLUNK_TOKEN:
+            # Same header splunklib sends for token authentication, so both clients agree on SPLUNK_TOKEN
+            headers["Authorization"] = SPLUNK_TOKEN if SPLUNK_TOKEN.startswith("Splunk ") else f"Splunk {SPLUNK_TOKEN}"
+        else:
+            auth = (SPLUNK_USERNAME, SPLUNK_PASSWORD)
+        
+        _HTTP_CLIENT = httpx.AsyncClient(
+            base_url=f"{SPLUNK_SCHEME}://{SPLUNK_HOST}:{SPLUNK_PORT}",
+            verify=_SSL_CTX,
+            auth=auth,
+            headers=headers,
+            limits=httpx.Limits(max_connections=64),
+            timeout=30  # 30 second timeout
+        )
+    
+    return _HTTP_CLIENT
+
+async def splunk_rest_get(path: str, **params: Any) -> Dict[str, Any]:
+    """
+    Call a Splunk REST endpoint with GET and return the parsed JSON response.
+    
+    Args:
+        path: REST endpoint path, e.g. /services/data/indexes
+        **params: Additional query parameters
+        
+    Returns:
+        Parsed JSON response body
+        
+    Raises:
+        httpx.HTTPStatusError: If Splunk returns an error status
+    """
+    response = await get_splunk_http_client().get(path, params={"output_mode": "json", **params})
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
+def _read_job_results(job: "splunklib.client.Job", max_results: int = 0) -> List[Dict[str, Any]]:
+    """
+    Read the results of a finished search job in batches.
+    
+    Results are fetched SEARCH_RESULTS_BATCH_SIZE rows at a time, so only one
+    batch of raw JSON is buffered and parsed at once.
+    
+    Args:
+        job: The finished search job
+        max_results: Maximum number of results to read (0 reads all results)
+        
+    Returns:
+        List of result rows
+    """
+    rows = []
+    while True:
+        count = SEARCH_RESULTS_BATCH_SIZE
+        if max_results > 0:
+            count = min(count, max_results - len(rows))
+            if count <= 0:
+                break
+        
+        result_stream = job.results(output_mode='json', count=count, offset=len(rows))
+        batch = orjson.loads(result_stream.read()).get("results", [])
+        rows.extend(batch)
+        
+        # A short batch means there are no more results to page through
+        if len(batch) < count:
+            break
+    
+    return rows
+
+# Matches queries that already start with '|' or 'search', ignoring leading whitespace
+_SEARCH_PREFIX = re.compile(r"\s*(\||search)", re.IGNORECASE)
+
+# Matches a head command anywhere in a search pipeline
+_HEAD_COMMAND = re.compile(r"\|\s*head\b", re.IGNORECASE)
+
+def _splunk_tool(error_message: str):
+    """
+    Log and re-raise any exception escaping the decorated tool.
+    
+    Args:
+        error_message: Message logged together with the exception
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                logger.error("❌ %s: %s", error_message, e)
+                raise
+        return wrapper
+    return decorator
 
 @mcp.tool()
+@_splunk_tool("Search failed")
 async def search_splunk(search_query: str, earliest_time: str = "-24h", latest_time: str = "now", max_results: int = 100) -> List[Dict[str, Any]]:
     """
     Execute a Splunk search query and return the results.
@@ -353,38 +532,34 @@ async def search_splunk(search_query: str, earliest_time: str = "-24h", latest_t
         raise ValueError("Search query cannot be empty")
     
     # Prepend 'search' if not starting with '|' or 'search' (case-insensitive)
-    stripped_query = search_query.lstrip()
-    if not (stripped_query.startswith('|') or stripped_query.lower().startswith('search')):
+    if not _SEARCH_PREFIX.match(search_query):
         search_query = f"search {search_query}"
     
-    try:
-        service = await get_splunk_connection()
-        logger.info(f"🔍 Executing search: {search_query}")
-        
-        def _execute_search():
-            # Create the search job
-            kwargs_search = {
-                "earliest_time": earliest_time,
-                "latest_time": latest_time,
-                "preview": False,
-                "exec_mode": "blocking"
-            }
-            
-            job = service.jobs.create(search_query, **kwargs_search)
-            
-            # Get the results
-            result_stream = job.results(output_mode='json', count=max_results)
-            results_data = json.loads(result_stream.read().decode('utf-8'))
-            
-            return results_data.get("results", [])
+    # Let the search head stop the pipeline once max_results rows are produced
+    if max_results > 0 and not _HEAD_COMMAND.search(search_query):
+        search_query = f"{search_query} | head {max_results}"
+    
+    service = await get_splunk_connection()
+    logger.info(f"🔍 Executing search: {search_query}")
+    
+    def _execute_search():
+        # Create the search job
+        kwargs_search = {
+            "earliest_time": earliest_time,
+            "latest_time": latest_time,
+            "preview": False,
+            "exec_mode": "blocking"
+        }
         
-        return await asyncio.to_thread(_execute_search)
+        job = service.jobs.create(search_query, **kwargs_search)
         
-    except Exception as e:
-        logger.error(f"❌ Search failed: {str(e)}")
-        raise
+        # Get the results
+        return _read_job_results(job, max_results)
+    
+    return await asyncio.to_thread(_execute_search)
 
 @mcp.tool()
+@_splunk_tool("Failed to list indexes")
 async def list_indexes() -> Dict[str, List[str]]:
     """
     Get a list of all available Splunk indexes.
@@ -392,20 +567,13 @@ async def list_indexes() -> Dict[str, List[str]]:
     Returns:
         Dictionary containing list of indexes
     """
-    try:
-        service = await get_splunk_connection()
-        
-        def _list_indexes():
-            indexes = [index.name for index in service.indexes]
-            logger.info(f"📊 Found {len(indexes)} indexes")
-            return {"indexes": indexes}
-        
-        return await asyncio.to_thread(_list_indexes)
-    except Exception as e:
-        logger.error(f"❌ Failed to list indexes: {str(e)}")
-        raise
+    data = await splunk_rest_get("/services/data/indexes", count=-1)
+    indexes = [entry["name"] for entry in data.get("entry", [])]
+    logger.info(f"📊 Found {len(indexes)} indexes")
+    return {"indexes": indexes}
 
 @mcp.tool()
+@_splunk_tool("Failed to get index info")
 async def get_index_info(index_name: str) -> Dict[str, Any]:
     """
     Get metadata for a specific Splunk index.
@@ -417,29 +585,24 @@ async def get_index_info(index_name: str) -> Dict[str, Any]:
         Dictionary containing index metadata
     """
     try:
-        service = await get_splunk_connection()
-        
-        def _get_index_info():
-            index = service.indexes[index_name]
-            
-            return {
-                "name": index_name,
-                "total_event_count": str(index["totalEventCount"]),
-                "current_size": str(index["currentDBSizeMB"]),
-                "max_size": str(index["maxTotalDataSizeMB"]),
-                "min_time": str(index["minTime"]),
-                "max_time": str(index["maxTime"])
-            }
+        data = await splunk_rest_get(f"/services/data/indexes/{quote(index_name, safe='')}")
+        index = data["entry"][0]["content"]
         
-        return await asyncio.to_thread(_get_index_info)
-    except KeyError:
-        logger.error(f"❌ Index not found: {index_name}")
+        return {
+            "name": index_name,
+            "total_event_count": str(index["totalEventCount"]),
+            "current_size": str(index["currentDBSizeMB"]),
+            "max_size": str(index["maxTotalDataSizeMB"]),
+            "min_time": str(index["minTime"]),
+            "max_time": str(index["maxTime"])
+        }
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 404:
+            raise
         raise ValueError(f"Index not found: {index_name}")
-    except Exception as e:
-        logger.error(f"❌ Failed to get index info: {str(e)}")
-        raise
 
 @mcp.tool()
+@_splunk_tool("Failed to list saved searches")
 async def list_saved_searches() -> List[Dict[str, Any]]:
     """
     List all saved searches in Splunk
@@ -447,32 +610,63 @@ async def list_saved_searches() -> List[Dict[str, Any]]:
     Returns:
         List of saved searches with their names, descriptions, and search queries
     """
-    try:
-        service = await get_splunk_connection()
+    service = await get_splunk_connection()
+    
+    def _list_saved_searches():
+        saved_searches = []
         
-        def _list_saved_searches():
-            saved_searches = []
+        for saved_search in service.saved_searches:
+            try:
+                saved_searches.append({
+                    "name": saved_search.name,
+                    "description": saved_search.description or "",
+                    "search": saved_search.search
+                })
+            except Exception as e:
+                logger.warning("⚠️ Error processing saved search: %s", e)
+                continue
             
-            for saved_search in service.saved_searches:
-                try:
-                    saved_searches.append({
-                        "name": saved_search.name,
-                        "description": saved_search.description or "",
-                        "search": saved_search.search
-                    })
-                except Exception as e:
-                    logger.warning(f"⚠️ Error processing saved search: {str(e)}")
-                    continue
-                
-            return saved_searches
-        
-        return await asyncio.to_thread(_list_saved_searches)
+        return saved_searches
+    
+    return await asyncio.to_thread(_list_saved_searches)
+
+def _as_list(value: Any) -> List[Any]:
+    """Normalize a Splunk field that may be missing, a single string, or a list"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+def _user_to_dict(username: str, content: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert a Splunk user's name and content into the dictionary returned by the user tools.
+    
+    Args:
+        username: The Splunk username
+        content: The user entity's content, if any
         
-    except Exception as e:
-        logger.error(f"❌ Failed to list saved searches: {str(e)}")
-        raise
+    Returns:
+        Dictionary with the user's name, real name, email, roles, capabilities,
+        default app and type; missing fields fall back to defaults
+    """
+    if not isinstance(content, dict):
+        logger.warning("⚠️ User %s has no content, using default values", username)
+        content = {}
+    
+    get = content.get
+    return {
+        "username": username,
+        "real_name": get('realname') or "N/A",
+        "email": get('email') or "N/A",
+        "roles": _as_list(get('roles')),
+        "capabilities": _as_list(get('capabilities')),
+        "default_app": get('defaultApp') or "search",
+        "type": get('type') or "user"
+    }
 
 @mcp.tool()
+@_splunk_tool("Error getting current user")
 async def current_user() -> Dict[str, Any]:
     """
     Get information about the currently authenticated user.
@@ -486,141 +680,62 @@ async def current_user() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Dictionary containing user information
     """
+    logger.info("👤 Fetching current user information...")
+    
+    # First try to get username from environment variable
+    current_username = SPLUNK_USERNAME
+    logger.debug("Using username from environment: %s", current_username)
+    
+    # Try to get additional context information
     try:
-        service = await get_splunk_connection()
-        logger.info("👤 Fetching current user information...")
-        
-        # First try to get username from environment variable
-        current_username = os.environ.get("SPLUNK_USERNAME", "admin")
-        logger.debug(f"Using username from environment: {current_username}")
-        
-        # Try to get additional context information
-        try:
-            # Get the current username from the /services/authentication/current-context endpoint
-            current_context_resp = service.get("/services/authentication/current-context", **{"output_mode":"json"}).body.read()
-            current_context_obj = json.loads(current_context_resp)
-            if "entry" in current_context_obj and len(current_context_obj["entry"]) > 0:
-                context_username = current_context_obj["entry"][0]["content"].get("username")
-                if context_username:
-                    current_username = context_username
-                    logger.debug(f"Using username from current-context: {current_username}")
-        except Exception as context_error:
-            logger.warning(f"⚠️ Could not get username from current-context: {str(context_error)}")
-        
-        try:
-            # Get the current user by username
-            current_user = service.users[current_username]
-            
-            # Ensure roles is a list
-            roles = []
-            if hasattr(current_user, 'roles') and current_user.roles:
-                roles = list(current_user.roles)
-            else:
-                # Try to get from content
-                if hasattr(current_user, 'content'):
-                    roles = current_user.content.get("roles", [])
-                else:
-                    roles = current_user.get("roles", [])
-                
-                if roles is None:
-                    roles = []
-                elif isinstance(roles, str):
-                    roles = [roles]
-            
-            # Determine how to access user properties
-            if hasattr(current_user, 'content') and isinstance(current_user.content, dict):
-                user_info = {
-                    "username": current_user.name,
-                    "real_name": current_user.content.get('realname', "N/A") or "N/A",
-                    "email": current_user.content.get('email', "N/A") or "N/A",
-                    "roles": roles,
-                    "capabilities": current_user.content.get('capabilities', []) or [],
-                    "default_app": current_user.content.get('defaultApp', "search") or "search",
-                    "type": current_user.content.get('type', "user") or "user"
-                }
-            else:
-                user_info = {
-                    "username": current_user.name,
-                    "real_name": current_user.get("realname", "N/A") or "N/A",
-                    "email": current_user.get("email", "N/A") or "N/A",
-                    "roles": roles,
-                    "capabilities": current_user.get("capabilities", []) or [],
-                    "default_app": current_user.get("defaultApp", "search") or "search",
-                    "type": current_user.get("type", "user") or "user"
-                }
-            
-            logger.info(f"✅ Successfully retrieved current user information: {current_user.name}")
-            return user_info
-            
-        except KeyError:
-            logger.error(f"❌ User not found: {current_username}")
-            raise ValueError(f"User not found: {current_username}")
-            
-    except Exception as e:
-        logger.error(f"❌ Error getting current user: {str(e)}")
-        raise
+        # Get the current username from the /services/authentication/current-context endpoint
+        current_context_obj = await splunk_rest_get("/services/authentication/current-context")
+        if "entry" in current_context_obj and len(current_context_obj["entry"]) > 0:
+            context_username = current_context_obj["entry"][0]["content"].get("username")
+            if context_username:
+                current_username = context_username
+                logger.debug("Using username from current-context: %s", current_username)
+    except Exception as context_error:
+        logger.warning(f"⚠️ Could not get username from current-context: {str(context_error)}")
+    
+    try:
+        # Get the current user by username
+        data = await splunk_rest_get(f"/services/authentication/users/{quote(current_username, safe='')}")
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 404:
+            raise
+        logger.error(f"❌ User not found: {current_username}")
+        raise ValueError(f"User not found: {current_username}")
+    
+    entry = data["entry"][0]
+    user_info = _user_to_dict(entry["name"], entry.get("content"))
+    
+    logger.info(f"✅ Successfully retrieved current user information: {user_info['username']}")
+    return user_info
 
 @mcp.tool()
+@_splunk_tool("Error listing users")
 async def list_users() -> List[Dict[str, Any]]:
     """List all Splunk users (requires admin privileges)"""
-    try:
-        service = await get_splunk_connection()
-        logger.info("👥 Fetching Splunk users...")
-                
-        users = []
-        for user in service.users:
-            try:
-                if hasattr(user, 'content'):
-                    # Ensure roles is a list
-                    roles = user.content.get('roles', [])
-                    if roles is None:
-                        roles = []
-                    elif isinstance(roles, str):
-                        roles = [roles]
-                    
-                    # Ensure capabilities is a list
-                    capabilities = user.content.get('capabilities', [])
-                    if capabilities is None:
-                        capabilities = []
-                    elif isinstance(capabilities, str):
-                        capabilities = [capabilities]
-                    
-                    user_info = {
-                        "username": user.name,
-                        "real_name": user.content.get('realname', "N/A") or "N/A",
-                        "email": user.content.get('email', "N/A") or "N/A",
-                        "roles": roles,
-                        "capabilities": capabilities,
-                        "default_app": user.content.get('defaultApp', "search") or "search",
-                        "type": user.content.get('type', "user") or "user"
-                    }
-                    users.append(user_info)
-                    logger.debug(f"✅ Successfully processed user: {user.name}")
-                else:
-                    # Handle users without content
-                    user_info = {
-                        "username": user.name,
-                        "real_name": "N/A",
-                        "email": "N/A",
-                        "roles": [],
-                        "capabilities": [],
-                        "default_app": "search",
-                        "type": "user"
-                    }
-                    users.append(user_info)
-                    logger.warning(f"⚠️ User {user.name} has no content, using default values")
-            except Exception as e:
-                logger.warning(f"⚠️ Error processing user {user.name}: {str(e)}")
-                continue
-            
-        logger.info(f"✅ Found {len(users)} users")
-        return users
-        
-    except Exception as e:
-        logger.error(f"❌ Error listing users: {str(e)}")
-        raise
+    logger.info("👥 Fetching Splunk users...")
+    
+    # Every user's content comes back in a single request
+    data = await splunk_rest_get("/services/authentication/users", count=-1)
+    
+    users = []
+    for entry in data.get("entry", []):
+        try:
+            users.append(_user_to_dict(entry["name"], entry.get("content")))
+            logger.debug("✅ Successfully processed user: %s", entry["name"])
+        except Exception as e:
+            logger.warning("⚠️ Error processing user %s: %s", entry.get("name"), e)
+            continue
+    
+    logger.info(f"✅ Found {len(users)} users")
+    return users
 
 @mcp.tool()
+@_splunk_tool("Error listing KV store collections")
 async def list_kvstore_collections() -> List[Dict[str, Any]]:
     """
     List all KV store collections across apps.
@@ -628,70 +743,81 @@ async def list_kvstore_collections() -> List[Dict[str, Any]]:
     Returns:
         List of KV store collections with metadata including app, fields, and accelerated fields
     """
+    logger.info("📚 Fetching KV store collections...")
+    
+    collections = []
+    collections_found = 0
+    
+    # The record count stats and the collection configs are independent, so fetch them concurrently;
+    # collection configs across all apps come back in a single request, under the
+    # "nobody" owner that splunklib's service.kvstore uses
+    stats_data, config_data = await asyncio.gather(
+        splunk_rest_get("/services/server/introspection/kvstore/collectionstats"),
+        splunk_rest_get("/servicesNS/nobody/-/storage/collections/config", count=-1),
+        return_exceptions=True
+    )
+    
+    if isinstance(config_data, BaseException):
+        logger.error(f"❌ Error accessing KV store collections: {str(config_data)}")
+        raise config_data
+    
+    # Get KV store collection stats to retrieve record counts
+    collection_stats = {}
     try:
-        service = await get_splunk_connection()
-        logger.info("📚 Fetching KV store collections...")
-        
-        collections = []
-        app_count = 0
-        collections_found = 0
-        
-        # Get KV store collection stats to retrieve record counts
-        collection_stats = {}
-        try:
-            stats_response = service.get("/services/server/introspection/kvstore/collectionstats", output_mode="json")
-            stats_data = json.loads(stats_response.body.read())
-            if "entry" in stats_data and len(stats_data["entry"]) > 0:
-                entry = stats_data["entry"][0]
-                content = entry.get("content", {})
-                data = content.get("data", {})
-                for kvstore in data:
-                    kvstore = json.loads(kvstore)
-                    if "ns" in kvstore and "count" in kvstore:
-                        collection_stats[kvstore["ns"]] = kvstore["count"]
-                logger.debug(f"✅ Retrieved stats for {len(collection_stats)} KV store collections")
-        except Exception as e:
-            logger.warning(f"⚠️ Error retrieving KV store collection stats: {str(e)}")
-            
+        if isinstance(stats_data, BaseException):
+            raise stats_data
+        if "entry" in stats_data and len(stats_data["entry"]) > 0:
+            entry = stats_data["entry"][0]
+            content = entry.get("content", {})
+            data = content.get("data", {})
+            collection_stats = {
+                kvstore["ns"]: kvstore["count"]
+                for kvstore in map(orjson.loads, data)
+                if "ns" in kvstore and "count" in kvstore
+            }
+            logger.debug("✅ Retrieved stats for %s KV store collections", len(collection_stats))
+    except Exception as e:
+        logger.warning(f"⚠️ Error retrieving KV store collection stats: {str(e)}")
+    
+    for entry in config_data.get("entry", []):
         try:
-            for entry in service.kvstore:
-                try:
-                    collection_name = entry['name']
-                    fieldsList = [f.replace('field.', '') for f in entry['content'] if f.startswith('field.')]
-                    accelFields = [f.replace('accelerated_field.', '') for f in entry['content'] if f.startswith('accelerated_field.')]
-                    app_name = entry['access']['app']
-                    collection_data = {
-                        "name": collection_name,
-                        "app": app_name,
-                        "fields": fieldsList,
-                        "accelerated_fields": accelFields,
-                        "record_count": collection_stats.get(f"{app_name}.{collection_name}", 0)
-                    }
-                    collections.append(collection_data)
-                    collections_found += 1
-                    logger.debug(f"✅ Added collection: {collection_name} from app: {app_name}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Error processing collection entry: {str(e)}")
-                    continue
-            
-            logger.info(f"✅ Found {collections_found} KV store collections")
-            return collections
-            
+            collection_name = entry['name']
+            # Split field definitions in one pass; slice off the known prefixes.
+            # Most settings keys match neither prefix, so reject them on the first character
+            fieldsList = []
+            accelFields = []
+            for f in entry['content']:
+                c = f[:1]
+                if c == 'f' and f.startswith('field.'):
+                    fieldsList.append(f[6:])
+                elif c == 'a' and f.startswith('accelerated_field.'):
+                    accelFields.append(f[18:])
+            app_name = entry['acl']['app']
+            collection_data = {
+                "name": collection_name,
+                "app": app_name,
+                "fields": fieldsList,
+                "accelerated_fields": accelFields,
+                "record_count": collection_stats.get(f"{app_name}.{collection_name}", 0)
+            }
+            collections.append(collection_data)
+            collections_found += 1
+            logger.debug("✅ Added collection: %s from app: %s", collection_name, app_name)
         except Exception as e:
-            logger.error(f"❌ Error accessing KV store collections: {str(e)}")
-            raise
-            
-    except Exception as e:
-        logger.error(f"❌ Error listing KV store collections: {str(e)}")
-        raise
+            logger.warning("⚠️ Error processing collection entry: %s", e)
+            continue
+    
+    logger.info(f"✅ Found {collections_found} KV store collections")
+    return collections
 
 @mcp.tool()
+@_splunk_tool("Health check failed")
 async def health_check() -> Dict[str, Any]:
     """Get basic Splunk connection information and list available apps"""
-    try:
-        service = await get_splunk_connection()
-        logger.info("🏥 Performing health check...")
-        
+    service = await get_splunk_connection()
+    logger.info("🏥 Performing health check...")
+    
+    def _health_check():
         # List available apps
         apps = []
         for app in service.apps:
@@ -703,108 +829,112 @@ async def health_check() -> Dict[str, Any]:
                 }
                 apps.append(app_info)
             except Exception as e:
-                logger.warning(f"⚠️ Error getting info for app {app['name']}: {str(e)}")
+                logger.warning("⚠️ Error getting info for app %s: %s", app['name'], e)
                 continue
-        
+    
         response = {
             "status": "healthy",
             "connection": {
                 "host": SPLUNK_HOST,
                 "port": SPLUNK_PORT,
                 "scheme": SPLUNK_SCHEME,
-                "username": os.environ.get("SPLUNK_USERNAME", "admin"),
+                "username": SPLUNK_USERNAME,
                 "ssl_verify": VERIFY_SSL
             },
             "apps_count": len(apps),
             "apps": apps
         }
-        
+    
         logger.info(f"✅ Health check successful. Found {len(apps)} apps")
         return response
-        
-    except Exception as e:
-        logger.error(f"❌ Health check failed: {str(e)}")
-        raise
+    
+    return await asyncio.to_thread(_health_check)
 
 @mcp.tool()
+@_splunk_tool("Error getting indexes and sourcetypes")
 async def get_indexes_and_sourcetypes() -> Dict[str, Any]:
     """
     Get a list of all indexes and their sourcetypes.
     
-    This endpoint performs a search to gather:
-    - All available indexes
+    This endpoint performs a single tstats search to gather:
+    - All indexes with events in the last 24 hours
     - All sourcetypes within each index
     - Event counts for each sourcetype
     - Time range information
     
     Returns:
         Dict[str, Any]: Dictionary containing:
-            - indexes: List of all accessible indexes
+            - indexes: List of accessible indexes with events in the search window
             - sourcetypes: Dictionary mapping indexes to their sourcetypes
             - metadata: Additional information about the search
     """
-    try:
-        service = await get_splunk_connection()
-        logger.info("📊 Fetching indexes and sourcetypes...")
-        
-        # Get list of indexes
-        indexes = [index.name for index in service.indexes]
-        logger.info(f"Found {len(indexes)} indexes")
-        
+    service = await get_splunk_connection()
+    logger.info("📊 Fetching indexes and sourcetypes...")
+    
+    def _search_sourcetypes():
         # Search for sourcetypes across all indexes
         search_query = """
         | tstats count WHERE index=* BY index, sourcetype
         | stats count BY index, sourcetype
         | sort - count
         """
-        
+    
         kwargs_search = {
             "earliest_time": "-24h",
             "latest_time": "now",
             "preview": False,
             "exec_mode": "blocking"
         }
-        
+    
         logger.info("🔍 Executing search for sourcetypes...")
         job = service.jobs.create(search_query, **kwargs_search)
-        
-        # Get the results
-        result_stream = job.results(output_mode='json')
-        results_data = json.loads(result_stream.read().decode('utf-8'))
-        
-        # Process results
-        sourcetypes_by_index = {}
-        for result in results_data.get('results', []):
-            index = result.get('index', '')
-            sourcetype = result.get('sourcetype', '')
-            count = result.get('count', '0')
-            
-            if index not in sourcetypes_by_index:
-                sourcetypes_by_index[index] = []
-            
-            sourcetypes_by_index[index].append({
-                'sourcetype': sourcetype,
-                'count': count
-            })
-        
-        response = {
-            'indexes': indexes,
-            'sourcetypes': sourcetypes_by_index,
-            'metadata': {
-                'total_indexes': len(indexes),
-                'total_sourcetypes': sum(len(st) for st in sourcetypes_by_index.values()),
-                'search_time_range': '24 hours'
-            }
+    
+        # Page through every row; the results endpoint returns only 100 rows by default
+        return _read_job_results(job)
+    
+    results_data = await asyncio.to_thread(_search_sourcetypes)
+    
+    # Process results; the tstats rows are grouped by index, so they also give the index list
+    sourcetypes_by_index = {}
+    for result in results_data:
+        index = result.get('index', '')
+        sourcetype = result.get('sourcetype', '')
+        count = result.get('count', '0')
+    
+        if index not in sourcetypes_by_index:
+            sourcetypes_by_index[index] = []
+    
+        sourcetypes_by_index[index].append({
+            'sourcetype': sourcetype,
+            'count': count
+        })
+    
+    indexes = sorted(index for index in sourcetypes_by_index if index)
+    logger.info("Found %s indexes", len(indexes))
+    
+    response = {
+        'indexes': indexes,
+        'sourcetypes': sourcetypes_by_index,
+        'metadata': {
+            'total_indexes': len(indexes),
+            'total_sourcetypes': sum(len(st) for st in sourcetypes_by_index.values()),
+            'search_time_range': '24 hours'
         }
-        
-        logger.info(f"✅ Successfully retrieved indexes and sourcetypes")
-        return response
-        
-    except Exception as e:
-        logger.error(f"❌ Error getting indexes and sourcetypes: {str(e)}")
-        raise
+    }
+    
+    logger.info("✅ Successfully retrieved indexes and sourcetypes")
+    return response
+
+def _tool_field(tool_info: Any, field: str, default: Any = None) -> Any:
+    """Read a field from a registered tool, which may be a dict or a tool object, or default if it is missing"""
+    if isinstance(tool_info, dict):
+        return tool_info.get(field, default)
+    if hasattr(tool_info, "__dict__"):
+        return vars(tool_info).get(field, default)
+    return default
 
 @mcp.tool()
+@_splunk_tool("Error listing tools")
 async def list_tools() -> List[Dict[str, Any]]:
     """
     List all available MCP tools.
@@ -812,80 +942,84 @@ async def list_tools() -> List[Dict[str, Any]]:
     Returns:
         List of all available tools with their name, description, and parameters.
     """
-    try:
-        logger.info("🧰 Listing available MCP tools...")
-        tools_list = []
-        
-        # Try to access tools from different potential attributes
-        if hasattr(mcp, '_tools') and isinstance(mcp._tools, dict):
-            # Direct access to the tools dictionary
-            for name, tool_info in mcp._tools.items():
-                try:
-                    tool_data = {
-                        "name": name,
-                        "description": tool_info.get("description", "No description available"),
-                        "parameters": tool_info.get("parameters", {})
-                    }
-                    tools_list.append(tool_data)
-                except Exception as e:
-                    logger.warning(f"⚠️ Error processing tool {name}: {str(e)}")
-                    continue
-                    
-        elif hasattr(mcp, 'tools') and callable(getattr(mcp, 'tools', None)):
-            # Tools accessed as a method
-            for name, tool_info in mcp.tools().items():
-                try:
-                    tool_data = {
-                        "name": name,
-                        "description": tool_info.get("description", "No description available"),
-                        "parameters": tool_info.get("parameters", {})
-                    }
-                    tools_list.append(tool_data)
-                except Exception as e:
-                    logger.warning(f"⚠️ Error processing tool {name}: {str(e)}")
-                    continue
-                    
-        elif hasattr(mcp, 'registered_tools') and isinstance(mcp.registered_tools, dict):
-            # Access through registered_tools attribute
-            for name, tool_info in mcp.registered_tools.items():
-                try:
-                    description = (
-                        tool_info.get("description", None) or 
-                        getattr(tool_info, "description", None) or
-                        "No description available"
-                    )
-                    
-                    parameters = (
-                        tool_info.get("parameters", None) or 
-                        getattr(tool_info, "parameters", None) or
-                        {}
-                    )
-                    
-                    tool_data = {
-                        "name": name,
-                        "description": description,
-                        "parameters": parameters
-                    }
-                    tools_list.append(tool_data)
-                except Exception as e:
-                    logger.warning(f"⚠️ Error processing tool {name}: {str(e)}")
-                    continue
-        
-        # Sort tools by name for consistent ordering
-        tools_list.sort(key=lambda x: x["name"])
-        
-        logger.info(f"✅ Found {len(tools_list)} tools")
-        return tools_list
-        
-    except Exception as e:
-        logger.error(f"❌ Error listing tools: {str(e)}")
-        raise
+    logger.info("🧰 Listing available MCP tools...")
+    tools_list = []
+    
+    # Try to access tools from different potential attributes
+    if hasattr(mcp, '_tool_manager'):
+        # FastMCP keeps its registered Tool objects in a tool manager
+        for tool in mcp._tool_manager.list_tools():
+            tools_list.append({
+                "name": tool.name,
+                "description": tool.description or "No description available",
+                "parameters": tool.parameters
+            })
+    
+    elif hasattr(mcp, '_tools') and isinstance(mcp._tools, dict):
+        # Direct access to the tools dictionary
+        for name, tool_info in mcp._tools.items():
+            try:
+                tool_data = {
+                    "name": name,
+                    "description": tool_info.get("description", "No description available"),
+                    "parameters": tool_info.get("parameters", {})
+                }
+                tools_list.append(tool_data)
+            except Exception as e:
+                logger.warning("⚠️ Error processing tool %s: %s", name, e)
+                continue
+                
+    elif hasattr(mcp, 'tools') and callable(getattr(mcp, 'tools', None)):
+        # Tools accessed as a method
+        for name, tool_info in mcp.tools().items():
+            try:
+                tool_data = {
+                    "name": name,
+                    "description": tool_info.get("description", "No description available"),
+                    "parameters": tool_info.get("parameters", {})
+                }
+                tools_list.append(tool_data)
+            except Exception as e:
+                logger.warning("⚠️ Error processing tool %s: %s", name, e)
+                continue
+                
+    elif hasattr(mcp, 'registered_tools') and isinstance(mcp.registered_tools, dict):
+        # Access through registered_tools attribute
+        for name, tool_info in mcp.registered_tools.items():
+            try:
+                description = _tool_field(tool_info, "description", "No description available")
+                parameters = _tool_field(tool_info, "parameters", {})
+                
+                tool_data = {
+                    "name": name,
+                    "description": description,
+                    "parameters": parameters
+                }
+                tools_list.append(tool_data)
+            except Exception as e:
+                logger.warning("⚠️ Error processing tool %s: %s", name, e)
+                continue
+    
+    # Sort tools by name for consistent ordering
+    tools_list.sort(key=itemgetter("name"))
+    
+    logger.info(f"✅ Found {len(tools_list)} tools")
+    return tools_list
 
 @mcp.tool()
 async def health() -> Dict[str, Any]:
     """Get basic Splunk connection information and list available apps (same as health_check but for endpoint consistency)"""
     return await health_check()
 
+# Static part of the ping response; only the timestamp changes between calls
+_PING_STATIC = {
+    "status": "ok",
+    "server": "splunk-mcp",
+    "version": VERSION,
+    "protocol": "mcp",
+    "capabilities": ["splunk"]
+}
+
 @mcp.tool()
 async def ping() -> Dict[str, Any]:
     """
@@ -900,14 +1034,7 @@ async def ping() -> Dict[str, Any]:
         Dict[str, Any]: Dictionary containing status and basic server information
     """
     try:
-        return {
-            "status": "ok",
-            "server": "splunk-mcp",
-            "version": VERSION,
-            "timestamp": datetime.now().isoformat(),
-            "protocol": "mcp",
-            "capabilities": ["splunk"]
-        }
+        return {**_PING_STATIC, "timestamp": datetime.now().isoformat()}
     except Exception as e:
         logger.error(f"❌ Error in ping endpoint: {str(e)}")
         return {
@@ -917,8 +1044,6 @@ async def ping() -> Dict[str, Any]:
         }
 
 if __name__ == "__main__":
-    import sys
-    
     # Get the mode from command line arguments
     mode = sys.argv[1] if len(sys.argv) > 1 else "sse"
     
@@ -927,9 +1052,9 @@ if __name__ == "__main__":
         sys.exit(1)
     
     # Set logger level to debug if DEBUG environment variable is set
-    if os.environ.get("DEBUG", "false").lower() == "true":
+    if DEBUG:
         logger.setLevel(logging.DEBUG)
-        logger.debug(f"Logger level set to DEBUG, server will run on port {FASTMCP_PORT}")
+        logger.debug("Logger level set to DEBUG, server will run on port %s", FASTMCP_PORT)
     
     # Start the server
     logger.info(f"🚀 Starting Splunk MCP server in {mode.upper()} mode")
@@ -938,5 +1063,32 @@ if __name__ == "__main__":
         # Run in stdio mode
         mcp.run(transport=mode)
     else:
+        import uvicorn
+        
+        # Prefer uvloop for the SSE event loop (not available on Windows)
+        loop = "asyncio"
+        if sys.platform != "win32":
+            try:
+                import uvloop  # noqa: F401
+                loop = "uvloop"
+            except ImportError:
+                logger.warning("⚠️ uvloop not installed, falling back to the asyncio event loop")
+        
+        # Prefer the C-accelerated httptools HTTP/1.1 parser
+        http = "h11"
+        try:
+            import httptools  # noqa: F401
+            http = "httptools"
+        except ImportError:
+            logger.warning("⚠️ httptools not installed, falling back to the h11 HTTP parser")
+        
+        # SSE sessions live in the memory of the worker that opened them, so extra
+        # workers need a load balancer that keeps each client on the same worker
+        workers = int(os.environ.get("FASTMCP_WORKERS", "1"))
+        
         # Run in SSE mode with documentation
-        uvicorn.run(app, host="0.0.0.0", port=FASTMCP_PORT) 
+        if workers > 1:
+            # uvicorn needs an import string to spawn worker processes
+            uvicorn.run("splunk_mcp:app", host="0.0.0.0", port=FASTMCP_PORT, loop=loop, http=http, workers=workers)
+        else:
+            uvicorn.run(app, host="0.0.0.0", port=FASTMCP_PORT, loop=loop, http=http)
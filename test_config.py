@@ -15,6 +15,9 @@ CONNECTION_TIMEOUT = int(os.environ.get("SPLUNK_MCP_CONNECTION_TIMEOUT", "30"))
 # Request timeout in seconds
 REQUEST_TIMEOUT = int(os.environ.get("SPLUNK_MCP_TIMEOUT", "30"))
 
+# Maximum number of tool calls in flight at once
+MAX_CONCURRENT_TOOLS = int(os.environ.get("SPLUNK_MCP_MAX_CONCURRENT_TOOLS", "4"))
+
 # Verbose output (set to "false" to disable)
 VERBOSE_OUTPUT = os.environ.get("SPLUNK_MCP_VERBOSE", "true").lower() == "true"
 
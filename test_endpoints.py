@@ -14,16 +14,12 @@ Examples:
     python test_endpoints.py health_check list_indexes    # Test only health_check and list_indexes
 """
 
-import json
 import sys
 import time
-import os
 import argparse
 import asyncio
-import uuid
 import traceback
-from datetime import datetime
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any
 
 from mcp.client.session import ClientSession
 from mcp.client.sse import sse_client
@@ -61,12 +57,14 @@ async def run_tests(tool_names: List[str] = None) -> Dict[str, Any]:
                 tools = tools_response.tools
                 log(f"Available tools: {len(tools)} total")
                 
+                # Tool names in server order, built once for both branches below
+                available_tools = dict.fromkeys(tool.name for tool in tools)
+                
                 # If no specific tools requested, test all tools
                 if not tool_names:
-                    tool_names = [tool.name for tool in tools]
+                    tool_names = list(available_tools)
                 else:
                     # Validate requested tools exist
-                    available_tools = {tool.name for tool in tools}
                     valid_tools = []
                     for name in tool_names:
                         if name not in available_tools:
@@ -77,23 +75,33 @@ async def run_tests(tool_names: List[str] = None) -> Dict[str, Any]:
                 
                 log(f"Testing tools: {tool_names}")
                 
-                # Test each tool
-                for tool_name in tool_names:
-                    try:
+                # Test the tools concurrently over the one session; each call has its own request id
+                semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_TOOLS)
+                
+                async def call_tool(tool_name: str) -> types.CallToolResult:
+                    async with semaphore:
                         log(f"Testing tool: {tool_name}")
-                        result = await session.call_tool(tool_name, {})
-                        log(f"✅ {tool_name} - SUCCESS")
+                        return await session.call_tool(tool_name, {})
+                
+                outcomes = await asyncio.gather(
+                    *(call_tool(tool_name) for tool_name in tool_names),
+                    return_exceptions=True
+                )
+                
+                for tool_name, outcome in zip(tool_names, outcomes):
+                    if isinstance(outcome, BaseException):
+                        log(f"❌ {tool_name} - FAILED: {str(outcome)}", "ERROR")
                         results["tests"].append({
                             "tool": tool_name,
-                            "success": True,
-                            "response": result
+                            "success": False,
+                            "error": str(outcome)
                         })
-                    except Exception as e:
-                        log(f"❌ {tool_name} - FAILED: {str(e)}", "ERROR")
+                    else:
+                        log(f"✅ {tool_name} - SUCCESS")
                         results["tests"].append({
                             "tool": tool_name,
-                            "success": False,
-                            "error": str(e)
+                            "success": True,
+                            "response": outcome
                         })
                 
                 # Calculate summary statistics
@@ -149,13 +157,13 @@ Examples:
     args = parser.parse_args()
     
     # Run tests
-    start_time = time.time()
+    start_time = time.perf_counter()
     results = await run_tests(args.tools)
-    end_time = time.time()
+    elapsed = time.perf_counter() - start_time
     
     # Print summary
     print_summary(results)
-    log(f"Tests completed in {end_time - start_time:.2f} seconds")
+    log(f"Tests completed in {elapsed:.2f} seconds")
     
     # Return non-zero code if any test failed
     return 1 if results["failure"] > 0 else 0
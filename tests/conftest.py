@@ -0,0 +1,192 @@
+"""
+Shared pytest fixtures for the Splunk MCP tests.
+"""
+
+import copy
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+import orjson
+import pytest
+
+import splunk_mcp
+
+MOCK_INDEX_CONTENT = {
+    "totalEventCount": "1000",
+    "currentDBSizeMB": "100",
+    "maxTotalDataSizeMB": "500",
+    "minTime": "1609459200",
+    "maxTime": "1640995200"
+}
+
+# Canned Splunk REST API responses, keyed by request path
+MOCK_REST_RESPONSES = {
+    "/services/data/indexes": {
+        "entry": [{"name": "main", "content": MOCK_INDEX_CONTENT}]
+    },
+    "/services/data/indexes/main": {
+        "entry": [{"name": "main", "content": MOCK_INDEX_CONTENT}]
+    },
+    "/services/authentication/current-context": {
+        "entry": [{"content": {"username": "admin"}}]
+    },
+    "/services/authentication/users": {
+        "entry": [{
+            "name": "admin",
+            "content": {
+                "realname": "Administrator",
+                "email": "admin@example.com",
+                "roles": ["admin"],
+                "capabilities": ["admin_all_objects"],
+                "defaultApp": "search",
+                "type": "admin"
+            }
+        }]
+    },
+    "/services/authentication/users/admin": {
+        "entry": [{
+            "name": "admin",
+            "content": {
+                "realname": "Administrator",
+                "email": "admin@example.com",
+                "roles": ["admin"],
+                "capabilities": ["admin_all_objects"],
+                "defaultApp": "search",
+                "type": "admin"
+            }
+        }]
+    },
+    "/services/server/introspection/kvstore/collectionstats": {
+        "entry": [{
+            "content": {
+                "data": [json.dumps({"ns": "search.test_collection", "count": 5})]
+            }
+        }]
+    },
+    "/servicesNS/nobody/-/storage/collections/config": {
+        "entry": [{
+            "name": "test_collection",
+            "content": {"field.testField": "text"},
+            "acl": {"app": "search"}
+        }]
+    }
+}
+
+@pytest.fixture(autouse=True)
+def mock_splunk_rest(monkeypatch):
+    """
+    Route the shared Splunk REST client to canned responses.
+
+    Tests can add or replace responses by path. Unknown paths return 404, and
+    an exception stored as a response is raised to simulate connection errors.
+    """
+    responses = copy.deepcopy(MOCK_REST_RESPONSES)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = responses.get(request.url.path)
+        if isinstance(body, Exception):
+            raise body
+        if body is None:
+            return httpx.Response(404, json={"messages": [{"type": "ERROR", "text": "Not Found"}]})
+        return httpx.Response(200, json=body)
+
+    client = httpx.AsyncClient(base_url="https://splunk.test:8089", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(splunk_mcp, "_HTTP_CLIENT", client)
+    return responses
+
+class MockCollection(dict):
+    """Splunk collection stand-in: looked up by name, iterated by value"""
+
+    def __iter__(self):
+        return iter(self.values())
+
+class MockResultStream:
+    """Job results stream stand-in that returns the same pre-encoded payload on every read"""
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+    def read(self) -> bytes:
+        return self.payload
+
+def mock_collection(*entities):
+    """Build a MockCollection keyed by each entity's name"""
+    return MockCollection((entity.name, entity) for entity in entities)
+
+def mock_collection_of_dicts(*entities):
+    """Build a MockCollection of dict entities, for code that reads fields by key"""
+    return MockCollection((entity["name"], entity) for entity in entities)
+
+# Search job whose results are encoded once and served by every results() call
+MOCK_SEARCH_STREAM = MockResultStream(orjson.dumps({
+    "results": [
+        {"result": {"field1": "value1", "field2": "value2"}},
+        {"result": {"field1": "value3", "field2": "value4"}},
+        {"result": {"field1": "value5", "field2": "value6"}}
+    ]
+}))
+MOCK_SEARCH_JOB = SimpleNamespace(
+    name="search_1",
+    results=lambda output_mode='json', count=None, offset=0: MOCK_SEARCH_STREAM
+)
+
+# tstats job behind get_indexes_and_sourcetypes
+MOCK_SOURCETYPES_STREAM = MockResultStream(orjson.dumps({
+    "results": [
+        {"index": "main", "sourcetype": "access_combined", "count": "500"},
+        {"index": "main", "sourcetype": "apache_error", "count": "300"}
+    ]
+}))
+MOCK_SOURCETYPES_JOB = SimpleNamespace(
+    results=lambda output_mode='json', count=None, offset=0: MOCK_SOURCETYPES_STREAM
+)
+
+def create_mock_job(search, **kwargs):
+    """Default jobs.create behaviour: route tstats searches to the sourcetypes job"""
+    if "tstats" in search:
+        return MOCK_SOURCETYPES_JOB
+    return MOCK_SEARCH_JOB
+
+@pytest.fixture(scope="session")
+def mock_splunk_service():
+    """
+    Mock splunklib service shared by the whole session.
+
+    jobs.create stays a MagicMock so tests can assert on the submitted query or
+    install a side_effect; use_mock_splunk_service restores it after each test.
+    """
+    mock_jobs = mock_collection(MOCK_SEARCH_JOB)
+    mock_jobs.create = MagicMock(side_effect=create_mock_job)
+
+    return SimpleNamespace(
+        jobs=mock_jobs,
+        saved_searches=mock_collection(SimpleNamespace(
+            name="test_search",
+            description="Test search description",
+            search="index=main | stats count"
+        )),
+        # health_check reads app fields by key
+        apps=mock_collection_of_dicts({"name": "search", "label": "Search", "version": "8.0.0"})
+    )
+
+@pytest.fixture(autouse=True)
+def use_mock_splunk_service(request, monkeypatch):
+    """
+    Serve the shared mock service from get_splunk_connection for each test that
+    uses it, then clear its call history and restore the default jobs.create.
+    """
+    if "mock_splunk_service" not in request.fixturenames:
+        yield
+        return
+    service = request.getfixturevalue("mock_splunk_service")
+
+    async def get_mock_connection():
+        return service
+
+    monkeypatch.setattr(splunk_mcp, "get_splunk_connection", get_mock_connection)
+    yield
+    service.jobs.create.reset_mock()
+    service.jobs.create.side_effect = create_mock_job
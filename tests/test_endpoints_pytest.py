@@ -4,40 +4,40 @@ Test module for Splunk MCP endpoints using pytest.
 """
 
 import json
-import os
+import orjson
 import pytest
-import requests
 import time
-import uuid
 import ssl
-import importlib
-import asyncio
-import sys
-from typing import Dict, List, Any, Optional, Union, Tuple
-from unittest.mock import patch, MagicMock, call
+import httpx
+from unittest.mock import patch
 from datetime import datetime
+from io import BytesIO
+from types import SimpleNamespace
 
 # Import configuration
 import test_config as config
 # Import directly from splunk_mcp for direct function testing
 import splunk_mcp
-from splunk_mcp import mcp, get_splunk_connection
+from splunk_mcp import mcp
 
 # Configuration
 BASE_URL = config.SSE_BASE_URL
 TIMEOUT = config.REQUEST_TIMEOUT
 VERBOSE = config.VERBOSE_OUTPUT
 
-# Functions to test directly
+# Functions to test directly, looked up once by name
 # This provides better coverage than going through MCP's call_tool
-TEST_FUNCTIONS = [
-    "list_indexes",
-    "list_saved_searches",
-    "current_user",
-    "list_users",
-    "list_kvstore_collections",
-    "health_check"
-]
+TEST_FUNCTIONS = {
+    name: getattr(splunk_mcp, name)
+    for name in (
+        "list_indexes",
+        "list_saved_searches",
+        "current_user",
+        "list_users",
+        "list_kvstore_collections",
+        "health_check"
+    )
+}
 
 def log(message: str, level: str = "INFO") -> None:
     """Print log messages with timestamp"""
@@ -66,126 +66,6 @@ def function_params():
         }
     }
 
-# Fixture for mock Splunk service
-@pytest.fixture
-def mock_splunk_service():
-    """Create a mock Splunk service for testing"""
-    mock_service = MagicMock()
-    
-    # Mock index
-    mock_index = MagicMock()
-    mock_index.name = "main"
-    mock_index.get = lambda key, default=None: {
-        "totalEventCount": "1000", 
-        "currentDBSizeMB": "100", 
-        "maxTotalDataSizeMB": "500", 
-        "minTime": "1609459200", 
-        "maxTime": "1640995200"
-    }.get(key, default)
-    mock_index.__getitem__ = lambda self, key: {
-        "totalEventCount": "1000", 
-        "currentDBSizeMB": "100", 
-        "maxTotalDataSizeMB": "500", 
-        "minTime": "1609459200", 
-        "maxTime": "1640995200"
-    }.get(key)
-    
-    # Create a mock collection for indexes
-    mock_indexes = MagicMock()
-    mock_indexes.__getitem__ = MagicMock(side_effect=lambda key: 
-                                       mock_index if key == "main" 
-                                       else (_ for _ in ()).throw(KeyError(f"Index not found: {key}")))
-    mock_indexes.__iter__ = MagicMock(return_value=iter([mock_index]))
-    mock_indexes.keys = MagicMock(return_value=["main"])
-    mock_service.indexes = mock_indexes
-    
-    # Mock job
-    mock_job = MagicMock()
-    mock_job.sid = "search_1"
-    mock_job.state = "DONE"
-    mock_job.content = {"resultCount": 5, "doneProgress": 100}
-    
-    # Prepare search results
-    search_results = {
-        "results": [
-            {"result": {"field1": "value1", "field2": "value2"}},
-            {"result": {"field1": "value3", "field2": "value4"}},
-            {"result": {"field1": "value5", "field2": "value6"}}
-        ]
-    }
-    
-    mock_job.results = lambda output_mode='json', count=None: type('MockResultStream', (), {'read': lambda self: json.dumps(search_results).encode('utf-8')})()
-    mock_job.is_done.return_value = True
-    
-    # Create a mock collection for jobs
-    mock_jobs = MagicMock()
-    mock_jobs.__getitem__ = MagicMock(return_value=mock_job)
-    mock_jobs.__iter__ = MagicMock(return_value=iter([mock_job]))
-    mock_jobs.create = MagicMock(return_value=mock_job)
-    mock_service.jobs = mock_jobs
-    
-    # Mock saved searches
-    mock_saved_search = MagicMock()
-    mock_saved_search.name = "test_search"
-    mock_saved_search.description = "Test search description"
-    mock_saved_search.search = "index=main | stats count"
-    
-    mock_saved_searches = MagicMock()
-    mock_saved_searches.__iter__ = MagicMock(return_value=iter([mock_saved_search]))
-    mock_service.saved_searches = mock_saved_searches
-    
-    # Mock users for list_users
-    mock_user = MagicMock()
-    mock_user.name = "admin"
-    mock_user.roles = ["admin", "power"]
-    mock_user.email = "admin@example.com"
-    
-    mock_users = MagicMock()
-    mock_users.__iter__ = MagicMock(return_value=iter([mock_user]))
-    mock_service.users = mock_users
-    
-    # Mock kvstore collections
-    mock_collection = MagicMock()
-    mock_collection.name = "test_collection"
-    
-    mock_kvstore = MagicMock()
-    mock_kvstore.__iter__ = MagicMock(return_value=iter([mock_collection]))
-    mock_kvstore.create = MagicMock(return_value=True)
-    mock_kvstore.delete = MagicMock(return_value=True)
-    mock_service.kvstore = mock_kvstore
-    
-    # Mock sourcetypes
-    mock_sourcetypes_job = MagicMock()
-    mock_sourcetypes_job.results = lambda output_mode='json': type('MockResultStream', (), {
-        'read': lambda self: json.dumps({
-            "results": [
-                {"index": "main", "sourcetype": "access_combined", "count": "500"},
-                {"index": "main", "sourcetype": "apache_error", "count": "300"}
-            ]
-        }).encode('utf-8')
-    })()
-    mock_sourcetypes_job.is_done.return_value = True
-    
-    # Update the jobs.create to handle different search patterns
-    def create_mock_job(search, **kwargs):
-        if "sourcetype by index" in search:
-            return mock_sourcetypes_job
-        return mock_job
-    
-    mock_service.jobs.create = MagicMock(side_effect=create_mock_job)
-    
-    # Mock apps for health_check
-    mock_app = MagicMock()
-    mock_app.name = "search"
-    mock_app.label = "Search"
-    mock_app.version = "8.0.0"
-    
-    mock_apps = MagicMock()
-    mock_apps.__iter__ = MagicMock(return_value=iter([mock_app]))
-    mock_service.apps = mock_apps
-    
-    return mock_service
-
 @pytest.mark.parametrize("function_name", TEST_FUNCTIONS)
 @pytest.mark.asyncio
 async def test_function_directly(function_name, function_params, mock_splunk_service):
@@ -202,105 +82,172 @@ async def test_function_directly(function_name, function_params, mock_splunk_ser
     
     log(f"Testing function: {function_name} with params: {params}", "INFO")
     
-    # Use patch to mock Splunk connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        try:
-            # Get the function from the module
-            function = getattr(splunk_mcp, function_name)
-            
-            # Call the function with parameters
-            result = await function(**params)
-            
-            # For better test output, print the result
-            if VERBOSE:
-                log(f"Function result: {str(result)[:200]}...", "DEBUG")  # Limit output size
-            
-            # The test passes if we get a result without exception
-            assert result is not None
-            log(f"✅ {function_name} - SUCCESS", "SUCCESS")
-            
-        except Exception as e:
-            log(f"❌ {function_name} - FAILED: {str(e)}", "ERROR")
-            raise  # Re-raise the exception to fail the test
+    try:
+        function = TEST_FUNCTIONS[function_name]
+        
+        # Call the function with parameters
+        result = await function(**params)
+        
+        # For better test output, print the result
+        if VERBOSE:
+            log(f"Function result: {str(result)[:200]}...", "DEBUG")  # Limit output size
+        
+        # The test passes if we get a result without exception
+        assert result is not None
+        log(f"✅ {function_name} - SUCCESS", "SUCCESS")
+        
+    except Exception as e:
+        log(f"❌ {function_name} - FAILED: {str(e)}", "ERROR")
+        raise  # Re-raise the exception to fail the test
 
 # Test get_index_info specifically
 @pytest.mark.asyncio
 async def test_get_index_info(mock_splunk_service):
     """Test get_index_info function directly"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await splunk_mcp.get_index_info(index_name="main")
-        assert result is not None
-        assert result["name"] == "main"
+    result = await splunk_mcp.get_index_info(index_name="main")
+    assert result is not None
+    assert result["name"] == "main"
 
 # Test search_splunk specifically
 @pytest.mark.asyncio
 async def test_search_splunk(mock_splunk_service):
     """Test search_splunk function directly"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await splunk_mcp.search_splunk(
-            search_query="index=main | head 3",
-            earliest_time="-5m",
-            latest_time="now",
-            max_results=3
-        )
-        assert result is not None
-        assert isinstance(result, list)
+    result = await splunk_mcp.search_splunk(
+        search_query="index=main | head 3",
+        earliest_time="-5m",
+        latest_time="now",
+        max_results=3
+    )
+    assert result is not None
+    assert isinstance(result, list)
 
 # Test indexes_and_sourcetypes
 @pytest.mark.asyncio
 async def test_indexes_and_sourcetypes(mock_splunk_service):
     """Test get_indexes_and_sourcetypes function directly"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await splunk_mcp.get_indexes_and_sourcetypes()
-        assert result is not None
-        assert "indexes" in result
-        assert "sourcetypes" in result
-        assert "metadata" in result
-        assert "total_indexes" in result["metadata"]
+    result = await splunk_mcp.get_indexes_and_sourcetypes()
+    assert result is not None
+    assert "indexes" in result
+    assert "sourcetypes" in result
+    assert "metadata" in result
+    assert "total_indexes" in result["metadata"]
+    assert result["indexes"] == ["main"]
+
+# Test that every tstats row is read, not just the first results page
+@pytest.mark.asyncio
+async def test_indexes_and_sourcetypes_paged(mock_splunk_service, monkeypatch):
+    """Test that indexes beyond the first page of tstats rows are still listed"""
+    monkeypatch.setattr(splunk_mcp, "SEARCH_RESULTS_BATCH_SIZE", 2)
+    rows = [{"index": f"index_{i}", "sourcetype": "syslog", "count": str(10 - i)} for i in range(5)]
+
+    def results(output_mode="json", count=0, offset=0):
+        return BytesIO(orjson.dumps({"results": rows[offset:offset + count]}))
+
+    mock_splunk_service.jobs.create.side_effect = lambda search, **kwargs: SimpleNamespace(results=results)
+
+    result = await splunk_mcp.get_indexes_and_sourcetypes()
+
+    assert result["indexes"] == [row["index"] for row in rows]
+    assert result["metadata"]["total_indexes"] == 5
+
+# Test reading fields from registered tools
+def test_tool_field():
+    """Test that tool fields are read from dicts and tool objects alike"""
+    assert splunk_mcp._tool_field({"description": "From dict"}, "description") == "From dict"
+    assert splunk_mcp._tool_field(SimpleNamespace(description="From object"), "description") == "From object"
+    assert splunk_mcp._tool_field(SimpleNamespace(), "parameters") is None
+    assert splunk_mcp._tool_field("not a tool", "parameters") is None
+    # The default only replaces missing fields, not empty ones
+    assert splunk_mcp._tool_field({}, "parameters", {}) == {}
+    assert splunk_mcp._tool_field({"description": ""}, "description", "No description available") == ""
+
+# Test listing users from a single REST request
+@pytest.mark.asyncio
+async def test_list_users_rest(mock_splunk_rest):
+    """Test that list_users builds every user from one users listing"""
+    mock_splunk_rest["/services/authentication/users"]["entry"].append({"name": "bob"})
+
+    result = await splunk_mcp.list_users()
+
+    assert [user["username"] for user in result] == ["admin", "bob"]
+    assert result[0]["roles"] == ["admin"]
+    assert result[1]["email"] == "N/A"
 
 # Test KV store operations
 @pytest.mark.asyncio
 async def test_kvstore_operations(mock_splunk_service):
     """Test KV store operations directly"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        # Test list collections
-        list_result = await splunk_mcp.list_kvstore_collections()
-        assert list_result is not None
-        assert isinstance(list_result, list)
+    # Test list collections
+    list_result = await splunk_mcp.list_kvstore_collections()
+    assert list_result is not None
+    assert isinstance(list_result, list)
+
+# Test KV store field parsing and record counts
+@pytest.mark.asyncio
+async def test_kvstore_collection_fields(mock_splunk_rest):
+    """Test that collection fields, accelerated fields and record counts are extracted"""
+    mock_splunk_rest["/servicesNS/nobody/-/storage/collections/config"] = {
+        "entry": [{
+            "name": "test_collection",
+            "content": {"field.host": "string", "accelerated_field.by_host": '{"host": 1}', "replicate": "false"},
+            "acl": {"app": "search"}
+        }]
+    }
+    mock_splunk_rest["/services/server/introspection/kvstore/collectionstats"] = {
+        "entry": [{"content": {"data": [json.dumps({"ns": "search.test_collection", "count": 7})]}}]
+    }
+
+    result = await splunk_mcp.list_kvstore_collections()
+
+    assert result == [{
+        "name": "test_collection",
+        "app": "search",
+        "fields": ["host"],
+        "accelerated_fields": ["by_host"],
+        "record_count": 7
+    }]
+
+# Test that KV store collections are listed when the stats request fails
+@pytest.mark.asyncio
+async def test_kvstore_collections_without_stats(mock_splunk_rest):
+    """Test that a failed stats request leaves record counts at zero"""
+    mock_splunk_rest["/services/server/introspection/kvstore/collectionstats"] = httpx.ConnectError("Connection error")
+
+    result = await splunk_mcp.list_kvstore_collections()
+
+    assert [c["name"] for c in result] == ["test_collection"]
+    assert result[0]["record_count"] == 0
 
 # Test error handling for missing parameters
 @pytest.mark.asyncio
 async def test_missing_required_parameters(mock_splunk_service):
     """Test error handling for missing required parameters"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        with pytest.raises(TypeError):  # Missing required parameter will raise TypeError
-            await splunk_mcp.get_index_info()  # Missing index_name
+    with pytest.raises(TypeError):  # Missing required parameter will raise TypeError
+        await splunk_mcp.get_index_info()  # Missing index_name
 
 # Test error handling for index not found
 @pytest.mark.asyncio
 async def test_index_not_found(mock_splunk_service):
     """Test error handling for index not found"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        with pytest.raises(Exception):
-            await splunk_mcp.get_index_info(index_name="non_existent_index")
+    with pytest.raises(Exception):
+        await splunk_mcp.get_index_info(index_name="non_existent_index")
 
 # Test connection error handling
 @pytest.mark.asyncio
-async def test_connection_error():
+async def test_connection_error(mock_splunk_rest):
     """Test handling of Splunk connection errors"""
-    with patch("splunk_mcp.get_splunk_connection", side_effect=Exception("Connection error")):
-        with pytest.raises(Exception):
-            await splunk_mcp.list_indexes()
+    mock_splunk_rest["/services/data/indexes"] = httpx.ConnectError("Connection error")
+    with pytest.raises(Exception):
+        await splunk_mcp.list_indexes()
 
 # Test general utility functions
 @pytest.mark.asyncio
 async def test_health_check(mock_splunk_service):
     """Test health_check function directly"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await splunk_mcp.health_check()
-        assert result is not None
-        assert isinstance(result, dict)
-        assert "status" in result
+    result = await splunk_mcp.health_check()
+    assert result is not None
+    assert isinstance(result, dict)
+    assert "status" in result
 
 # Test FastMCP registration
 def test_tools_registration():
@@ -310,137 +257,222 @@ def test_tools_registration():
     # We can't directly access the tools list, but we can verify the instance exists
     assert hasattr(mcp, "call_tool")
 
+# Test paging through search job results
+def test_read_job_results_batches(monkeypatch):
+    """Test that job results are read in batches up to max_results"""
+    monkeypatch.setattr(splunk_mcp, "SEARCH_RESULTS_BATCH_SIZE", 2)
+    rows = [{"n": str(i)} for i in range(5)]
+    calls = []
+
+    def results(output_mode="json", count=0, offset=0):
+        calls.append((count, offset))
+        return BytesIO(orjson.dumps({"results": rows[offset:offset + count]}))
+
+    job = SimpleNamespace(results=results)
+
+    assert splunk_mcp._read_job_results(job, max_results=3) == rows[:3]
+    assert calls == [(2, 0), (1, 2)]
+
+    # max_results=0 reads everything
+    calls.clear()
+    assert splunk_mcp._read_job_results(job) == rows
+    assert calls == [(2, 0), (2, 2), (2, 4)]
+
+# Test user entity normalization
+def test_user_to_dict():
+    """Test that user entities are normalized, with defaults for missing fields"""
+    content = {"realname": "", "roles": "user", "capabilities": None}
+    assert splunk_mcp._user_to_dict("alice", content) == {
+        "username": "alice",
+        "real_name": "N/A",
+        "email": "N/A",
+        "roles": ["user"],
+        "capabilities": [],
+        "default_app": "search",
+        "type": "user"
+    }
+
+    # Users without content get the default values
+    assert splunk_mcp._user_to_dict("bob", None)["roles"] == []
+
+# Test OpenAPI schema caching
+@pytest.mark.asyncio
+async def test_openapi_schema_cached(monkeypatch):
+    """Test that the OpenAPI schema is built once and then served from cache"""
+    monkeypatch.setattr(splunk_mcp, "_OPENAPI_CACHE", None)
+    with patch("splunk_mcp.list_tools", return_value=[]) as mock_list_tools:
+        first = await splunk_mcp.get_openapi_schema_bytes()
+        second = await splunk_mcp.get_openapi_schema_bytes()
+
+    assert mock_list_tools.call_count == 1
+    assert first is second
+    assert orjson.loads(first)["info"]["version"] == splunk_mcp.VERSION
+
+# Test If-None-Match parsing for the OpenAPI ETag
+def test_etag_matches():
+    """Test that If-None-Match lists, weak validators and * match the schema ETag"""
+    etag = '"abc"'
+    assert splunk_mcp._etag_matches('"abc"', etag)
+    assert splunk_mcp._etag_matches('W/"abc"', etag)
+    assert splunk_mcp._etag_matches('"other", W/"abc"', etag)
+    assert splunk_mcp._etag_matches("*", etag)
+    assert not splunk_mcp._etag_matches('"other"', etag)
+    assert not splunk_mcp._etag_matches(None, etag)
+    assert not splunk_mcp._etag_matches("", etag)
+
+# Test that the OpenAPI schema documents the registered tools
+@pytest.mark.asyncio
+async def test_openapi_schema_lists_tools():
+    """Test that the OpenAPI schema includes the registered MCP tools and only real routes"""
+    schema = await splunk_mcp.build_openapi_schema()
+
+    assert "execute_search_splunk" in schema["x-mcp-tools"]
+    assert "search_splunkParameters" in schema["components"]["schemas"]
+    assert set(schema["paths"]) == {"/sse", "/messages"}
+
+# Test that the OpenAPI schema is built at startup
+def test_openapi_schema_built_at_startup(monkeypatch):
+    """Test that the app lifespan builds the OpenAPI schema before the first request"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(splunk_mcp, "_OPENAPI_CACHE", None)
+    with TestClient(splunk_mcp.app) as client:
+        assert splunk_mcp._OPENAPI_CACHE is not None
+        response = client.get("/openapi.json")
+
+    assert response.status_code == 200
+    assert response.content == splunk_mcp._OPENAPI_CACHE
+
+def test_openapi_schema_etag(monkeypatch):
+    """Test that /openapi.json answers a matching If-None-Match with 304"""
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(splunk_mcp, "_OPENAPI_CACHE", None)
+    with TestClient(splunk_mcp.app) as client:
+        response = client.get("/openapi.json")
+        etag = response.headers["etag"]
+        cached = client.get("/openapi.json", headers={"If-None-Match": etag})
+        stale = client.get("/openapi.json", headers={"If-None-Match": '"stale"'})
+
+    assert etag == splunk_mcp._OPENAPI_ETAG
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert stale.status_code == 200
+    assert stale.content == response.content
+
 # Test search_splunk with different parameters
 @pytest.mark.asyncio
 async def test_search_splunk_params(mock_splunk_service):
     """Test search_splunk with different parameter variations"""
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        # Test with minimal parameters
-        result1 = await splunk_mcp.search_splunk(
-            search_query="index=main"
-        )
-        assert result1 is not None
-        
-        # Test with different time ranges
-        result2 = await splunk_mcp.search_splunk(
-            search_query="index=main",
-            earliest_time="-1h",
-            latest_time="now"
-        )
-        assert result2 is not None
-        
-        # Test with max_results
-        result3 = await splunk_mcp.search_splunk(
-            search_query="index=main",
-            max_results=10
-        )
-        assert result3 is not None
+    # Test with minimal parameters
+    result1 = await splunk_mcp.search_splunk(
+        search_query="index=main"
+    )
+    assert result1 is not None
+    
+    # Test with different time ranges
+    result2 = await splunk_mcp.search_splunk(
+        search_query="index=main",
+        earliest_time="-1h",
+        latest_time="now"
+    )
+    assert result2 is not None
+    
+    # Test with max_results
+    result3 = await splunk_mcp.search_splunk(
+        search_query="index=main",
+        max_results=10
+    )
+    assert result3 is not None
+
+# Test that search_splunk limits the search pipeline to max_results
+@pytest.mark.asyncio
+async def test_search_splunk_head_limit(mock_splunk_service):
+    """Test that search_splunk appends a head command unless the query has one"""
+    await splunk_mcp.search_splunk(search_query="index=main", max_results=10)
+    assert mock_splunk_service.jobs.create.call_args[0][0] == "search index=main | head 10"
+
+    await splunk_mcp.search_splunk(search_query="index=main | HEAD 5", max_results=10)
+    assert mock_splunk_service.jobs.create.call_args[0][0] == "search index=main | HEAD 5"
+
+    await splunk_mcp.search_splunk(search_query="| makeresults", max_results=0)
+    assert mock_splunk_service.jobs.create.call_args[0][0] == "| makeresults"
+
+    await splunk_mcp.search_splunk(search_query="  SEARCH index=main", max_results=0)
+    assert mock_splunk_service.jobs.create.call_args[0][0] == "  SEARCH index=main"
 
 # Test SSL verification
-def test_ssl_verification():
-    """Test the SSL verification setting"""
-    # Instead of testing a non-existent get_ssl_context function,
-    # we'll test the VERIFY_SSL configuration
-    original_env = os.environ.copy()
+def test_ssl_verification(monkeypatch):
+    """Test that the SSL context follows the VERIFY_SSL setting"""
+    monkeypatch.setattr(splunk_mcp, "VERIFY_SSL", True)
+    context = splunk_mcp._build_ssl_context()
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert context.check_hostname is True
     
-    try:
-        # Test with VERIFY_SSL=true
-        os.environ["VERIFY_SSL"] = "true"
-        # Reload the module to refresh the VERIFY_SSL value
-        importlib.reload(splunk_mcp)
-        assert splunk_mcp.VERIFY_SSL is True
-        
-        # Test with VERIFY_SSL=false
-        os.environ["VERIFY_SSL"] = "false"
-        # Reload the module to refresh the VERIFY_SSL value
-        importlib.reload(splunk_mcp)
-        assert splunk_mcp.VERIFY_SSL is False
-        
-    finally:
-        # Restore the environment
-        os.environ.clear()
-        os.environ.update(original_env)
-        # Reload the module to restore the original state
-        importlib.reload(splunk_mcp)
+    monkeypatch.setattr(splunk_mcp, "VERIFY_SSL", False)
+    context = splunk_mcp._build_ssl_context()
+    assert context.verify_mode == ssl.CERT_NONE
+    assert context.check_hostname is False
+
+def use_splunk_settings(monkeypatch, **settings):
+    """Override Splunk settings and rebuild the connect arguments without reloading splunk_mcp"""
+    for name, value in settings.items():
+        monkeypatch.setattr(splunk_mcp, name, value)
+    monkeypatch.setattr(splunk_mcp, "_CONNECT_KWARGS", splunk_mcp._build_connect_kwargs())
+    monkeypatch.setattr(splunk_mcp, "_SERVICE", None)
 
 # Test service connection with different parameters
 @pytest.mark.asyncio
-async def test_splunk_connection_params():
+async def test_splunk_connection_params(monkeypatch):
     """Test Splunk connection with different parameters"""
     with patch("splunklib.client.connect") as mock_connect:
-        mock_service = MagicMock()
-        mock_connect.return_value = mock_service
+        mock_connect.return_value = SimpleNamespace()
         
-        # Normal connection - get_splunk_connection is not async in splunk_mcp.py
-        splunk_mcp.get_splunk_connection()
+        # Normal connection
+        monkeypatch.setattr(splunk_mcp, "_SERVICE", None)
+        await splunk_mcp.get_splunk_connection()
         mock_connect.assert_called_once()
         
         # Reset mock
         mock_connect.reset_mock()
         
         # Connection with custom parameters
-        with patch.dict("os.environ", {
-            "SPLUNK_HOST": "custom-host",
-            "SPLUNK_PORT": "8888",
-            "SPLUNK_USERNAME": "custom-user", 
-            "SPLUNK_PASSWORD": "custom-pass"
-        }):
-            # Reload module to refresh environment variables
-            importlib.reload(splunk_mcp)
-            splunk_mcp.get_splunk_connection()
-            # Check if connect was called with the proper parameters
-            call_kwargs = mock_connect.call_args[1]
-            assert call_kwargs["host"] == "custom-host"
-            # Port might be converted to int by the function
-            assert str(call_kwargs["port"]) == "8888"
-            assert call_kwargs["username"] == "custom-user"
-            assert call_kwargs["password"] == "custom-pass"
-
-# Test job waiting with timeout
+        use_splunk_settings(
+            monkeypatch,
+            SPLUNK_HOST="custom-host",
+            SPLUNK_PORT=8888,
+            SPLUNK_USERNAME="custom-user",
+            SPLUNK_PASSWORD="custom-pass",
+            SPLUNK_TOKEN=None
+        )
+        await splunk_mcp.get_splunk_connection()
+        # Check if connect was called with the proper parameters
+        call_kwargs = mock_connect.call_args[1]
+        assert call_kwargs["host"] == "custom-host"
+        assert call_kwargs["port"] == 8888
+        assert call_kwargs["username"] == "custom-user"
+        assert call_kwargs["password"] == "custom-pass"
+
+# Test that the Splunk service is reused between calls
 @pytest.mark.asyncio
-async def test_search_job_timeout():
-    """Test handling of Splunk job timeout"""
-    # Create a job that never finishes
-    mock_timeout_job = MagicMock()
-    mock_timeout_job.is_done = MagicMock(return_value=False)
-    mock_timeout_job.sid = "timeout_job"
-    
-    timeout_service = MagicMock()
-    timeout_service.jobs.create = MagicMock(return_value=mock_timeout_job)
-    
-    # Patch time.sleep to speed up the test
-    with patch("splunk_mcp.get_splunk_connection", return_value=timeout_service), \
-         patch("asyncio.sleep", return_value=None), \
-         patch("time.time", side_effect=[0, 15, 30, 60, 120]):  # Simulate timeout
-        
-        # Make a custom search function with a timeout - not using await since get_splunk_connection is not async
-        async def test_search_with_timeout():
-            service = splunk_mcp.get_splunk_connection()
-            job = service.jobs.create(
-                "search index=main", 
-                earliest_time="-24h", 
-                latest_time="now"
-            )
-            # Wait for job completion with a timeout
-            max_wait = 100  # seconds
-            start_time = time.time()
-            while not job.is_done() and time.time() - start_time < max_wait:
-                await asyncio.sleep(1)
-            
-            if not job.is_done():
-                raise Exception(f"Search timed out after {max_wait} seconds")
-            return []
-        
-        with pytest.raises(Exception) as excinfo:
-            await test_search_with_timeout()
-        
-        assert "timed out" in str(excinfo.value).lower()
+async def test_splunk_connection_cached(monkeypatch):
+    """Test that get_splunk_connection connects once and then reuses the service"""
+    monkeypatch.setattr(splunk_mcp, "_SERVICE", None)
+    with patch("splunklib.client.connect") as mock_connect:
+        first = await splunk_mcp.get_splunk_connection()
+        second = await splunk_mcp.get_splunk_connection()
+
+    mock_connect.assert_called_once()
+    assert mock_connect.call_args[1]["autologin"] is True
+    assert mock_connect.call_args[1]["context"] is splunk_mcp._SSL_CTX
+    assert first is second
 
 @pytest.mark.asyncio
 async def test_ping():
     """Test the ping endpoint for server health check"""
     result = await mcp.call_tool("ping", {})
-    result_dict = json.loads(result[0].text)
+    result_dict = orjson.loads(result[0].text)
     
     assert result_dict["status"] == "ok"
     assert result_dict["server"] == "splunk-mcp"
@@ -459,23 +491,38 @@ async def test_ping():
     assert timestamp_valid, "Timestamp is not in a valid ISO format"
 
 @pytest.mark.asyncio
-async def test_splunk_token_auth():
+async def test_splunk_token_auth(monkeypatch):
     """Test Splunk connection with token-based authentication"""
     with patch("splunklib.client.connect") as mock_connect:
-        mock_service = MagicMock()
-        mock_connect.return_value = mock_service
-        with patch.dict("os.environ", {
-            "SPLUNK_HOST": "token-host",
-            "SPLUNK_PORT": "9999",
-            "SPLUNK_TOKEN": "test-token",
-            "SPLUNK_USERNAME": "should-not-be-used",
-            "SPLUNK_PASSWORD": "should-not-be-used"
-        }):
-            importlib.reload(splunk_mcp)
-            splunk_mcp.get_splunk_connection()
-            call_kwargs = mock_connect.call_args[1]
-            assert call_kwargs["host"] == "token-host"
-            assert str(call_kwargs["port"]) == "9999"
-            assert call_kwargs["token"] == "Bearer test-token"
-            assert "username" not in call_kwargs
-            assert "password" not in call_kwargs 
\ No newline at end of file
+        mock_connect.return_value = SimpleNamespace()
+        use_splunk_settings(
+            monkeypatch,
+            SPLUNK_HOST="token-host",
+            SPLUNK_PORT=9999,
+            SPLUNK_TOKEN="test-token",
+            SPLUNK_USERNAME="should-not-be-used",
+            SPLUNK_PASSWORD="should-not-be-used"
+        )
+        await splunk_mcp.get_splunk_connection()
+        call_kwargs = mock_connect.call_args[1]
+        assert call_kwargs["host"] == "token-host"
+        assert call_kwargs["port"] == 9999
+        # The token is passed through as configured; splunklib adds its own scheme prefix
+        assert call_kwargs["token"] == "test-token"
+        assert "username" not in call_kwargs
+        assert "password" not in call_kwargs 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("token, header", [
+    ("test-token", "Splunk test-token"),
+    ("Splunk test-token", "Splunk test-token"),
+    ("Bearer test-token", "Splunk Bearer test-token")
+])
+async def test_rest_client_token_header(monkeypatch, token, header):
+    """Test that the REST client sends SPLUNK_TOKEN exactly as splunklib does"""
+    use_splunk_settings(monkeypatch, SPLUNK_TOKEN=token)
+    monkeypatch.setattr(splunk_mcp, "_HTTP_CLIENT", None)
+    client = splunk_mcp.get_splunk_http_client()
+    try:
+        assert client.headers["Authorization"] == header
+    finally:
+        await client.aclose()
@@ -1,193 +1,40 @@
 import pytest
-import json
-from unittest.mock import Mock, patch, MagicMock
-import splunklib.client
-from datetime import datetime
-from splunk_mcp import get_splunk_connection, mcp
+import orjson
+import httpx
+from splunk_mcp import mcp
 
-# Ensure pytest-mock is available for the 'mocker' fixture
-try:
-    import pytest_mock  # noqa: F401
-except ImportError:
-    # If pytest-mock is not installed, provide a fallback for 'mocker'
-    @pytest.fixture
-    def mocker():
-        from unittest import mock
-        return mock
-    # Note: For full functionality, install pytest-mock: pip install pytest-mock
+# Every test calls tools through the FastMCP server; bind the method once
+call_tool = mcp.call_tool
 
 # Helper function to extract JSON from TextContent objects
 def extract_json_from_result(result):
     """Extract JSON data from FastMCP TextContent objects or regular dict/list objects"""
-    if hasattr(result, '__iter__') and not isinstance(result, (dict, str)):
-        # It's likely a list of TextContent objects
-        if len(result) > 0 and hasattr(result[0], 'text'):
-            try:
-                return json.loads(result[0].text)
-            except json.JSONDecodeError:
-                return result[0].text
+    # call_tool returns a list of content objects; parse the first one
+    if isinstance(result, (list, tuple)) and result and hasattr(result[0], 'text'):
+        try:
+            return orjson.loads(result[0].text)
+        except orjson.JSONDecodeError:
+            return result[0].text
     return result
 
-# Mock Splunk service fixture
-@pytest.fixture
-def mock_splunk_service(mocker):
-    mock_service = MagicMock()
-    
-    # Mock index
-    mock_index = MagicMock()
-    mock_index.name = "main"
-    mock_index.get = lambda key, default=None: {
-        "totalEventCount": "1000", 
-        "currentDBSizeMB": "100", 
-        "maxTotalDataSizeMB": "500", 
-        "minTime": "1609459200", 
-        "maxTime": "1640995200"
-    }.get(key, default)
-    mock_index.__getitem__ = lambda self, key: {
-        "totalEventCount": "1000", 
-        "currentDBSizeMB": "100", 
-        "maxTotalDataSizeMB": "500", 
-        "minTime": "1609459200", 
-        "maxTime": "1640995200"
-    }.get(key)
-    
-    # Create a mock collection for indexes
-    mock_indexes = MagicMock()
-    mock_indexes.__getitem__ = MagicMock(side_effect=lambda key: 
-                                       mock_index if key == "main" 
-                                       else (_ for _ in ()).throw(KeyError(f"Index not found: {key}")))
-    mock_indexes.__iter__ = MagicMock(return_value=iter([mock_index]))
-    mock_indexes.keys = MagicMock(return_value=["main"])
-    mock_service.indexes = mock_indexes
-    
-    # Mock job
-    mock_job = MagicMock()
-    mock_job.sid = "search_1"
-    mock_job.state = "DONE"
-    mock_job.content = {"resultCount": 5, "doneProgress": 100}
-    
-    # Prepare search results that match the format returned by the actual tool
-    search_results = {
-        "results": [
-            {"result": {"field1": "value1", "field2": "value2"}},
-            {"result": {"field1": "value3", "field2": "value4"}},
-            {"result": {"field1": "value5", "field2": "value6"}},
-            {"result": {"field1": "value7", "field2": "value8"}},
-            {"result": {"field1": "value9", "field2": "value10"}}
-        ]
-    }
-    
-    mock_job.results = lambda output_mode='json', count=None: type('MockResultStream', (), {'read': lambda self: json.dumps(search_results).encode('utf-8')})()
-    mock_job.is_done.return_value = True
-    
-    # Create a mock collection for jobs
-    mock_jobs = MagicMock()
-    mock_jobs.__getitem__ = MagicMock(return_value=mock_job)
-    mock_jobs.__iter__ = MagicMock(return_value=iter([mock_job]))
-    mock_jobs.create = MagicMock(return_value=mock_job)
-    mock_service.jobs = mock_jobs
-    
-    # Mock saved searches
-    mock_saved_search = MagicMock()
-    mock_saved_search.name = "test_search"
-    mock_saved_search.description = "Test search description"
-    mock_saved_search.search = "index=main | stats count"
-    
-    mock_saved_searches = MagicMock()
-    mock_saved_searches.__iter__ = MagicMock(return_value=iter([mock_saved_search]))
-    mock_service.saved_searches = mock_saved_searches
-    
-    # Mock users
-    mock_user = MagicMock()
-    mock_user.name = "admin"
-    mock_user.content = {
-        "realname": "Administrator",
-        "email": "admin@example.com",
-        "roles": ["admin"],
-        "capabilities": ["admin_all_objects"],
-        "defaultApp": "search",
-        "type": "admin"
-    }
-    mock_user.roles = ["admin"]
-    
-    mock_users = MagicMock()
-    mock_users.__getitem__ = MagicMock(return_value=mock_user)
-    mock_users.__iter__ = MagicMock(return_value=iter([mock_user]))
-    mock_service.users = mock_users
-    
-    # Mock apps
-    mock_app = MagicMock()
-    mock_app.name = "search"
-    mock_app.label = "Search"
-    mock_app.version = "1.0.0"
-    mock_app.__getitem__ = lambda self, key: {
-        "name": "search",
-        "label": "Search",
-        "version": "1.0.0"
-    }.get(key)
-    
-    mock_apps = MagicMock()
-    mock_apps.__iter__ = MagicMock(return_value=iter([mock_app]))
-    mock_service.apps = mock_apps
-    
-    # Mock get method
-    def mock_get(endpoint, **kwargs):
-        if endpoint == "/services/authentication/current-context":
-            result = MagicMock()
-            result.body.read.return_value = json.dumps({
-                "entry": [{"content": {"username": "admin"}}]
-            }).encode('utf-8')
-            return result
-        elif endpoint == "/services/server/introspection/kvstore/collectionstats":
-            result = MagicMock()
-            result.body.read.return_value = json.dumps({
-                "entry": [{
-                    "content": {
-                        "data": [json.dumps({"ns": "search.test_collection", "count": 5})]
-                    }
-                }]
-            }).encode('utf-8')
-            return result
-        else:
-            raise Exception(f"Unexpected endpoint: {endpoint}")
-            
-    mock_service.get = mock_get
-    
-    # Mock KV store collections
-    mock_kvstore_entry = {
-        "name": "test_collection",
-        "content": {"field.testField": "text"},
-        "access": {"app": "search"}
-    }
-    
-    mock_kvstore = MagicMock()
-    mock_kvstore.__iter__ = MagicMock(return_value=iter([mock_kvstore_entry]))
-    mock_service.kvstore = mock_kvstore
-    
-    return mock_service
-
 @pytest.mark.asyncio
 async def test_list_indexes(mock_splunk_service):
     """Test the list_indexes MCP tool"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await mcp.call_tool("list_indexes", {})
-        parsed_result = extract_json_from_result(result)
-        assert isinstance(parsed_result, dict)
-        assert "indexes" in parsed_result
-        assert "main" in parsed_result["indexes"]
+    result = await call_tool("list_indexes", {})
+    parsed_result = extract_json_from_result(result)
+    assert isinstance(parsed_result, dict)
+    assert "indexes" in parsed_result
+    assert "main" in parsed_result["indexes"]
 
 @pytest.mark.asyncio
 async def test_get_index_info(mock_splunk_service):
     """Test the get_index_info MCP tool"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await mcp.call_tool("get_index_info", {"index_name": "main"})
-        parsed_result = extract_json_from_result(result)
-        assert parsed_result["name"] == "main"
-        assert parsed_result["total_event_count"] == "1000"
-        assert parsed_result["current_size"] == "100"
-        assert parsed_result["max_size"] == "500"
+    result = await call_tool("get_index_info", {"index_name": "main"})
+    parsed_result = extract_json_from_result(result)
+    assert parsed_result["name"] == "main"
+    assert parsed_result["total_event_count"] == "1000"
+    assert parsed_result["current_size"] == "100"
+    assert parsed_result["max_size"] == "500"
 
 @pytest.mark.asyncio
 async def test_search_splunk(mock_splunk_service):
@@ -199,27 +46,16 @@ async def test_search_splunk(mock_splunk_service):
         "max_results": 100
     }
     
-    expected_results = [
-        {"result": {"field1": "value1", "field2": "value2"}},
-        {"result": {"field1": "value3", "field2": "value4"}},
-        {"result": {"field1": "value5", "field2": "value6"}},
-        {"result": {"field1": "value7", "field2": "value8"}},
-        {"result": {"field1": "value9", "field2": "value10"}}
-    ]
+    result = await call_tool("search_splunk", search_params)
+    
+    # Each row comes back as its own content item
+    assert len(result) == 3
+    assert extract_json_from_result(result) == {"result": {"field1": "value1", "field2": "value2"}}
+    assert orjson.loads(result[-1].text) == {"result": {"field1": "value5", "field2": "value6"}}
     
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        # Create a more direct patch to bypass the complex search logic
-        with patch("splunk_mcp.search_splunk", return_value=expected_results):
-            # Just verify that the call succeeds without exception
-            result = await mcp.call_tool("search_splunk", search_params)
-            
-            # Print for debug purposes
-            if isinstance(result, list) and len(result) > 0 and hasattr(result[0], 'text'):
-                print(f"DEBUG: search_splunk result: {result[0].text}")
-                
-            # For this test, we just verify it doesn't throw an exception
-            assert True
+    # The search is capped at max_results on the search head
+    query = mock_splunk_service.jobs.create.call_args.args[0]
+    assert query == "search index=main | head 100"
 
 @pytest.mark.asyncio
 async def test_search_splunk_invalid_query(mock_splunk_service):
@@ -231,26 +67,22 @@ async def test_search_splunk_invalid_query(mock_splunk_service):
         "max_results": 100
     }
     
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        with pytest.raises(Exception, match="Search query cannot be empty"):
-            await mcp.call_tool("search_splunk", search_params)
+    with pytest.raises(Exception, match="Search query cannot be empty"):
+        await call_tool("search_splunk", search_params)
 
 @pytest.mark.asyncio
-async def test_connection_error():
+async def test_connection_error(mock_splunk_rest):
     """Test handling of connection errors"""
-    # Mock get_splunk_connection to raise an exception
-    with patch("splunk_mcp.get_splunk_connection", side_effect=Exception("Connection failed")):
-        with pytest.raises(Exception, match="Connection failed"):
-            await mcp.call_tool("list_indexes", {})
+    # Make the Splunk REST API unreachable
+    mock_splunk_rest["/services/data/indexes"] = httpx.ConnectError("Connection failed")
+    with pytest.raises(Exception, match="Connection failed"):
+        await call_tool("list_indexes", {})
 
 @pytest.mark.asyncio
 async def test_get_index_info_not_found(mock_splunk_service):
     """Test get_index_info with non-existent index"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        with pytest.raises(Exception, match="Index not found: nonexistent"):
-            await mcp.call_tool("get_index_info", {"index_name": "nonexistent"})
+    with pytest.raises(Exception, match="Index not found: nonexistent"):
+        await call_tool("get_index_info", {"index_name": "nonexistent"})
 
 @pytest.mark.asyncio
 async def test_search_splunk_invalid_command(mock_splunk_service):
@@ -265,154 +97,71 @@ async def test_search_splunk_invalid_command(mock_splunk_service):
     # Mock the jobs.create to raise an exception
     mock_splunk_service.jobs.create.side_effect = Exception("Unknown search command 'invalid'")
     
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        with pytest.raises(Exception, match="Unknown search command 'invalid'"):
-            await mcp.call_tool("search_splunk", search_params)
-
-@pytest.mark.asyncio
-async def test_list_saved_searches(mock_splunk_service):
-    """Test the list_saved_searches MCP tool"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        # Mock the actual list_saved_searches function
-        with patch("splunk_mcp.list_saved_searches", return_value=[
-            {
-                "name": "test_search",
-                "description": "Test search description",
-                "search": "index=main | stats count"
-            }
-        ]):
-            result = await mcp.call_tool("list_saved_searches", {})
-            parsed_result = extract_json_from_result(result)
-            
-            # If parsed_result is a dict with a single item, convert it to a list
-            if isinstance(parsed_result, dict) and "name" in parsed_result:
-                parsed_result = [parsed_result]
-                
-            assert len(parsed_result) > 0
-            assert parsed_result[0]["name"] == "test_search"
-            assert parsed_result[0]["description"] == "Test search description"
-            assert parsed_result[0]["search"] == "index=main | stats count"
+    with pytest.raises(Exception, match="Unknown search command 'invalid'"):
+        await call_tool("search_splunk", search_params)
 
 @pytest.mark.asyncio
 async def test_current_user(mock_splunk_service):
     """Test the current_user MCP tool"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await mcp.call_tool("current_user", {})
-        parsed_result = extract_json_from_result(result)
-        assert isinstance(parsed_result, dict)
-        assert parsed_result["username"] == "admin"
-        assert parsed_result["real_name"] == "Administrator"
-        assert parsed_result["email"] == "admin@example.com"
-        assert "admin" in parsed_result["roles"]
-
-@pytest.mark.asyncio
-async def test_list_users(mock_splunk_service):
-    """Test the list_users MCP tool"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        # Mock the actual list_users function
-        with patch("splunk_mcp.list_users", return_value=[
-            {
-                "username": "admin",
-                "real_name": "Administrator",
-                "email": "admin@example.com",
-                "roles": ["admin"],
-                "capabilities": ["admin_all_objects"],
-                "default_app": "search",
-                "type": "admin"
-            }
-        ]):
-            result = await mcp.call_tool("list_users", {})
-            parsed_result = extract_json_from_result(result)
-            
-            # If parsed_result is a dict with username, convert it to a list
-            if isinstance(parsed_result, dict) and "username" in parsed_result:
-                parsed_result = [parsed_result]
-                
-            assert len(parsed_result) > 0
-            assert parsed_result[0]["username"] == "admin"
-            assert parsed_result[0]["real_name"] == "Administrator"
-            assert parsed_result[0]["email"] == "admin@example.com"
-
+    result = await call_tool("current_user", {})
+    parsed_result = extract_json_from_result(result)
+    assert isinstance(parsed_result, dict)
+    assert parsed_result["username"] == "admin"
+    assert parsed_result["real_name"] == "Administrator"
+    assert parsed_result["email"] == "admin@example.com"
+    assert "admin" in parsed_result["roles"]
+
+# The listing tools all return a list of entities, one content item each; check the first entity's key fields
+@pytest.mark.parametrize("tool_name, count, expected", [
+    ("list_saved_searches", 1, {
+        "name": "test_search",
+        "description": "Test search description",
+        "search": "index=main | stats count"
+    }),
+    ("list_users", 1, {
+        "username": "admin",
+        "real_name": "Administrator",
+        "email": "admin@example.com"
+    }),
+    ("list_kvstore_collections", 1, {
+        "name": "test_collection",
+        "app": "search"
+    })
+])
 @pytest.mark.asyncio
-async def test_list_kvstore_collections(mock_splunk_service):
-    """Test the list_kvstore_collections MCP tool"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        # Mock the actual list_kvstore_collections function
-        with patch("splunk_mcp.list_kvstore_collections", return_value=[
-            {
-                "name": "test_collection",
-                "app": "search",
-                "fields": ["testField"],
-                "accelerated_fields": [],
-                "record_count": 5
-            }
-        ]):
-            result = await mcp.call_tool("list_kvstore_collections", {})
-            parsed_result = extract_json_from_result(result)
-            
-            # If parsed_result is a dict with name, convert it to a list
-            if isinstance(parsed_result, dict) and "name" in parsed_result:
-                parsed_result = [parsed_result]
-                
-            assert len(parsed_result) > 0
-            assert parsed_result[0]["name"] == "test_collection"
-            assert parsed_result[0]["app"] == "search"
+async def test_list_tool(tool_name, count, expected, mock_splunk_service):
+    """Test the list_* MCP tools against the mock service and REST responses"""
+    result = await call_tool(tool_name, {})
+    entities = [orjson.loads(item.text) for item in result]
+    
+    assert len(entities) == count
+    for field, value in expected.items():
+        assert entities[0][field] == value
 
 @pytest.mark.asyncio
 async def test_health_check(mock_splunk_service):
     """Test the health_check MCP tool"""
-    # Mock get_splunk_connection
-    with patch("splunk_mcp.get_splunk_connection", return_value=mock_splunk_service):
-        result = await mcp.call_tool("health_check", {})
-        parsed_result = extract_json_from_result(result)
-        assert isinstance(parsed_result, dict)
-        assert parsed_result["status"] == "healthy"
-        assert "connection" in parsed_result
-        assert "apps" in parsed_result
-        assert len(parsed_result["apps"]) > 0
+    result = await call_tool("health_check", {})
+    parsed_result = extract_json_from_result(result)
+    assert isinstance(parsed_result, dict)
+    assert parsed_result["status"] == "healthy"
+    assert "connection" in parsed_result
+    assert "apps" in parsed_result
+    assert len(parsed_result["apps"]) > 0
 
 @pytest.mark.asyncio
 async def test_list_tools():
     """Test the list_tools MCP tool"""
-    # Directly patch the list_tools output
-    with patch("splunk_mcp.list_tools", return_value=[
-        {
-            "name": "search_splunk",
-            "description": "Execute a Splunk search query",
-            "parameters": {"search_query": {"type": "string"}}
-        },
-        {
-            "name": "list_indexes",
-            "description": "List available indexes",
-            "parameters": {}
-        }
-    ]):
-        result = await mcp.call_tool("list_tools", {})
-        parsed_result = extract_json_from_result(result)
-        
-        # If parsed_result is empty, use a default test list
-        if not parsed_result or (isinstance(parsed_result, list) and len(parsed_result) == 0):
-            parsed_result = [
-                {
-                    "name": "search_splunk",
-                    "description": "Execute a Splunk search query",
-                    "parameters": {"search_query": {"type": "string"}}
-                },
-                {
-                    "name": "list_indexes",
-                    "description": "List available indexes",
-                    "parameters": {}
-                }
-            ]
-            
-        assert isinstance(parsed_result, list)
-        assert len(parsed_result) > 0
-        # Each tool should have name, description, and parameters
-        tool = parsed_result[0]
-        assert "name" in tool
-        assert "description" in tool
-        assert "parameters" in tool 
\ No newline at end of file
+    result = await call_tool("list_tools", {})
+    tools = [orjson.loads(item.text) for item in result]
+    
+    # Every registered tool is listed, each with name, description, and parameters
+    assert len(tools) == len(mcp._tool_manager.list_tools())
+    names = {tool["name"] for tool in tools}
+    assert {"search_splunk", "list_indexes", "list_tools"} <= names
+    for tool in tools:
+        assert tool["description"]
+        assert "parameters" in tool
+    
+    search_tool = next(tool for tool in tools if tool["name"] == "search_splunk")
+    assert "search_query" in search_tool["parameters"]["properties"]